@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Maintenance script for the monthly audit_logs partitions (PostgreSQL).
+
+Converts audit_logs to a partitioned table if needed (run it once after
+upgrading, during a quiet period: the conversion copies the whole table
+under an exclusive lock), creates partitions for the coming months and
+archives partitions older than the retention window to gzip-compressed CSV
+files before dropping them. Schedule it monthly (e.g. from cron). Rows that
+reached the default partition because it ran late are moved into their
+month when that partition is created.
+
+Archived partitions can be restored with COPY ... FROM into a table
+created with CREATE TABLE ... (LIKE audit_logs).
+
+Usage:
+    # From backend directory:
+    python -m app.audit.maintain_partitions
+    python -m app.audit.maintain_partitions --months-ahead 6 --retain-months 12 --archive-dir /var/backups/audit
+    python -m app.audit.maintain_partitions --no-archive
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend directory to path to allow imports
+backend_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.config import settings
+from app.db import engine, create_tables
+from app.services.audit.partitions import AuditPartitionService
+
+
+def main():
+    """Main entry point for the audit partition maintenance script"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=settings.AUDIT_PARTITION_MONTHS_AHEAD,
+                        help="Months of future partitions to keep ready")
+    parser.add_argument("--retain-months", type=int, default=settings.AUDIT_RETENTION_MONTHS,
+                        help="Months of audit history to keep in the database")
+    parser.add_argument("--archive-dir", default=settings.AUDIT_ARCHIVE_DIR,
+                        help="Directory for archived partitions")
+    parser.add_argument("--no-archive", action="store_true", help="Only create partitions")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("Audit log partitioning requires PostgreSQL; nothing to do.")
+        return
+
+    print("Maintaining audit log partitions")
+    print("-" * 60)
+
+    try:
+        # Ensure tables exist
+        create_tables()
+
+        if AuditPartitionService.ensure_partitioned(engine, args.months_ahead):
+            print("Converted audit_logs to a partitioned table")
+
+        with engine.begin() as conn:
+            created = AuditPartitionService.create_future_partitions(conn, args.months_ahead)
+        print(f"Partitions created: {', '.join(created) if created else 'none'}")
+
+        if not args.no_archive:
+            with engine.begin() as conn:
+                archived = AuditPartitionService.archive_partitions(
+                    conn, args.retain_months, Path(args.archive_dir)
+                )
+            for path in archived:
+                print(f"Archived: {path}")
+            print(f"Partitions archived: {len(archived)}")
+
+        print("\n" + "-" * 60)
+        print("Maintenance finished successfully!")
+    except Exception as e:
+        print(f"\nError during maintenance: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
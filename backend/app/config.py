@@ -1,3 +1,4 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 from dotenv import load_dotenv
@@ -28,8 +29,47 @@ class Settings(BaseSettings):
     BREVO_API_KEY: str = os.getenv("BREVO_API_KEY")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     ELEVENLABS_API_KEY: str = os.getenv("ELEVENLABS_API_KEY")
+    BOOKINGS_PAGE_SIZE: int = 50
+    BOOKINGS_MAX_PAGE_SIZE: int = 500
+    BOOKINGS_STREAM_CHUNK_SIZE: int = 500
+    # Overlap between /api/bookings/changes polls; longer than any write transaction
+    BOOKINGS_SYNC_LAG_SECONDS: int = 60
+    TIMEZONE: str = "Africa/Johannesburg"
+    # Full reload of the cached occupancy intervals; changes in between are applied incrementally
+    OCCUPANCY_CACHE_SECONDS: int = 3600
+    OCCUPANCY_MAX_DAYS: int = 366
+    FORECAST_HISTORY_DAYS: int = 365
+    FORECAST_CACHE_SECONDS: int = 900
+    # On PostgreSQL only one server process sweeps at a time (advisory lock)
+    OVERSTAY_SWEEP_ENABLED: bool = True
+    OVERSTAY_SWEEP_SECONDS: int = 300
+    CSV_IMPORT_CHUNK_SIZE: int = 2000
+    CSV_IMPORT_MAX_ERRORS: int = 1000
+    # Parse processes per server process (1 = parse in-process, 0 = one per CPU); the import CLI uses one per CPU
+    CSV_PARSE_WORKERS: int = 1
+    CSV_PARSE_CHUNK_SIZE: int = 1000
+    CSV_DATE_SAMPLE_ROWS: int = 500
+    CSV_IMPORT_WORKERS: int = 1
+    CSV_IMPORT_DIR: str | None = None
+    CSV_IMPORT_JOB_TTL_SECONDS: int = 3600
+    # Queued audit events are lost if a process crashes before flushing; False writes them in the request transaction
+    AUDIT_ASYNC_ENABLED: bool = True
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 2.0
+    AUDIT_SPOOL_PATH: str = "audit_spool.jsonl"
+    # Top up future audit_logs partitions at startup; the conversion itself is done by app.audit.maintain_partitions
+    AUDIT_PARTITIONING_ENABLED: bool = True
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3
+    AUDIT_RETENTION_MONTHS: int = 24
+    AUDIT_ARCHIVE_DIR: str = "audit_archive"
     print(DATABASE_URL)
 
+    @field_validator("AUDIT_SPOOL_PATH", "AUDIT_ARCHIVE_DIR")
+    @classmethod
+    def resolve_backend_path(cls, value: str) -> str:
+        """Resolve relative paths against the backend directory, not the working directory."""
+        return str(_BACKEND_DIR / value)
+
 settings = Settings()
 
 # if __name__ == "__main__":
@@ -2,6 +2,9 @@
 """
 Standalone script to import CSV booking data into the database.
 
+Rows are parsed by one worker process per CPU, unlike imports run by the
+server, which use CSV_PARSE_WORKERS.
+
 Usage:
     # From backend directory:
     python -m app.csv.import_csv app/csv/test.csv
@@ -16,7 +19,7 @@ from pathlib import Path
 backend_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_dir))
 
-from app.services.csv_importer import CSVImporter
+from app.services.csv_copy_importer import CSVCopyImporter
 from app.db import SessionLocal, create_tables
 
 
@@ -55,8 +58,9 @@ def main():
     
     try:
         # Create importer and import
-        importer = CSVImporter(db)
-        stats = importer.import_from_file(csv_path, source="csv_import_script")
+        # COPY staging-table engine on PostgreSQL, multi-row inserts elsewhere
+        importer = CSVCopyImporter(db, parse_workers=0)
+        stats = importer.import_from_file(csv_path, source="csv_import_script", bulk=True)
         
         # Print results
         print(f"\nImport completed!")
@@ -66,11 +70,11 @@ def main():
         print(f"Skipped rows: {stats['skipped']}")
         
         if stats['errors']:
-            print(f"\nErrors encountered ({len(stats['errors'])}):")
+            print(f"\nErrors encountered ({stats['failed']}):")
             for error in stats['errors'][:10]:  # Show first 10 errors
                 print(f"  Row {error['row']}: {error['error']}")
-            if len(stats['errors']) > 10:
-                print(f"  ... and {len(stats['errors']) - 10} more errors")
+            if stats['failed'] > 10:
+                print(f"  ... and {stats['failed'] - 10} more errors")
         
         print("\n" + "-" * 60)
         print("Import finished successfully!")
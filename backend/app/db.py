@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import settings
 import psycopg2    
@@ -26,7 +26,116 @@ def get_db():
 def create_tables():
     """Create all database tables."""
     from . import models
+    create_extensions()
     Base.metadata.create_all(bind=engine)
+    upgrade_columns()
+    create_partitions()
+    create_indexes()
+    seed_revenue_rollup()
+
+
+def create_extensions():
+    """Enable PostgreSQL extensions required by model indexes (no-op elsewhere)."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+def upgrade_columns():
+    """
+    Bring tables created by older versions up to date
+    (create_all does not alter existing tables).
+    """
+    booking_columns = {column["name"] for column in inspect(engine).get_columns("bookings")}
+    if "note_count" not in booking_columns:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE bookings ADD COLUMN note_count INTEGER NOT NULL DEFAULT 0"))
+            conn.execute(text("ALTER TABLE bookings ADD COLUMN last_note TEXT"))
+            conn.execute(text("ALTER TABLE bookings ADD COLUMN last_note_at TIMESTAMP"))
+            backfill_notes(conn)
+
+    if engine.dialect.name != "postgresql":
+        return
+    # New enum labels cannot be used in the transaction that adds them
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ALTER TYPE auditeventtype ADD VALUE IF NOT EXISTS 'updated'"))
+    with engine.begin() as conn:
+        meta_type = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'audit_logs' AND column_name = 'meta_json'"
+        )).scalar()
+        if meta_type == "text":
+            conn.execute(text(
+                "ALTER TABLE audit_logs ALTER COLUMN meta_json TYPE JSONB USING meta_json::jsonb"
+            ))
+
+
+def backfill_notes(conn):
+    """Copy notes kept as "Note added: ..." audit log entries into booking_notes."""
+    conn.execute(text(
+        "INSERT INTO booking_notes (booking_id, author_user_id, body, created_at) "
+        "SELECT booking_id, actor_user_id, substr(message, 13), created_at FROM audit_logs "
+        "WHERE event_type = 'note' AND message LIKE 'Note added: %'"
+    ))
+    conn.execute(text(
+        "UPDATE bookings SET "
+        "note_count = (SELECT count(*) FROM booking_notes n WHERE n.booking_id = bookings.id), "
+        "last_note = (SELECT n.body FROM booking_notes n WHERE n.booking_id = bookings.id "
+        "ORDER BY n.created_at DESC, n.id DESC LIMIT 1), "
+        "last_note_at = (SELECT max(n.created_at) FROM booking_notes n WHERE n.booking_id = bookings.id) "
+        "WHERE id IN (SELECT booking_id FROM booking_notes)"
+    ))
+
+
+def create_partitions():
+    """
+    Make sure upcoming months have audit_logs partitions once the table has
+    been partitioned (no-op elsewhere, when disabled, or before the
+    conversion). Converting a plain table copies every row under an
+    exclusive lock, so it is left to python -m app.audit.maintain_partitions.
+    """
+    if engine.dialect.name != "postgresql" or not settings.AUDIT_PARTITIONING_ENABLED:
+        return
+    from .services.audit.partitions import AuditPartitionService
+    with engine.begin() as conn:
+        if AuditPartitionService.is_partitioned(conn):
+            AuditPartitionService.create_future_partitions(conn, settings.AUDIT_PARTITION_MONTHS_AHEAD)
+
+
+def create_indexes():
+    """Create indexes declared on models that are missing from existing tables."""
+    from . import models
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    if engine.dialect.name != "postgresql":
+        # Trigram indexes are PostgreSQL-only; earlier versions created plain copies elsewhere
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    if index.name.endswith("_trgm"):
+                        conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+def seed_revenue_rollup():
+    """
+    Fill the daily revenue rollup from the bookings table when it is empty
+    but bookings exist (first start after the rollup was added), so that
+    incremental updates to older bookings do not start from zero.
+    """
+    from .models import Booking, DailyRevenue
+    from .services.reports.revenue_rollup import RevenueRollupService
+    db = SessionLocal()
+    try:
+        if engine.dialect.name == "postgresql":
+            # One process seeds; the others wait here and then find it filled
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext('daily_revenue_seed'))"))
+        if db.query(DailyRevenue.id).first() is None and db.query(Booking.id).first() is not None:
+            RevenueRollupService.rebuild(db)
+    finally:
+        db.close()
 
 
 def drop_tables():
@@ -6,9 +6,17 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
 from .db import create_tables
+from .services.audit.audit_writer import start_audit_writer, stop_audit_writer
+from .services.csv_import_jobs import stop_import_workers
+from .services.csv_importer import stop_parse_workers
+from .services.bookings.overstay_detector import start_overstay_sweeps, stop_overstay_sweeps
 from .routes.csv import csv_import
 from .routes.bookings import booking_routes
 from .routes.bookings import webhook
+from .routes.customers import customer_routes
+from .routes.reports import report_routes
+from .routes.occupancy import occupancy_routes
+from .routes.audit import audit_routes
 from .routes.db_management import database_routes
 from .routes.users import users_routes
 from .routes.users import auth
@@ -33,6 +41,10 @@ app.add_middleware(
 app.include_router(csv_import.router)
 app.include_router(booking_routes.router)
 app.include_router(webhook.router)
+app.include_router(customer_routes.router)
+app.include_router(report_routes.router)
+app.include_router(occupancy_routes.router)
+app.include_router(audit_routes.router)
 app.include_router(database_routes.router)
 app.include_router(users_routes.router)
 app.include_router(auth.auth_router)
@@ -43,6 +55,19 @@ def on_startup():
     """Create database tables on application startup."""
     if settings.AUTO_CREATE_TABLES:
         create_tables()
+    if settings.AUDIT_ASYNC_ENABLED:
+        start_audit_writer()
+    if settings.OVERSTAY_SWEEP_ENABLED:
+        start_overstay_sweeps()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Stop background jobs on application shutdown."""
+    stop_overstay_sweeps()
+    stop_import_workers()
+    stop_parse_workers()
+    stop_audit_writer()
 
 
 @app.get("/health")
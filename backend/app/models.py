@@ -1,7 +1,8 @@
 import enum
-from datetime import datetime
+from datetime import datetime, date
 from sqlalchemy import (
     String,
+    Date,
     DateTime,
     Enum,
     Integer,
@@ -11,7 +12,9 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
     Index,
+    JSON,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .db import Base
 
@@ -45,6 +48,7 @@ class AuditEventType(str, enum.Enum):
     note = "NOTE"
     status_change = "STATUS_CHANGE"
     sync = "SYNC"
+    updated = "UPDATED"
 
 
 # ---------- Mixins ----------
@@ -82,6 +86,13 @@ class Customer(Base, TimestampMixin):
     __table_args__ = (
         Index("ix_customers_email_lower", "email"),
         Index("ix_customers_whatsapp", "whatsapp_number"),
+        # Trigram indexes for substring search (pg_trgm), created on PostgreSQL only
+        Index("ix_customers_full_name_trgm", "full_name",
+              postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_customers_email_trgm", "email",
+              postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_customers_whatsapp_trgm", "whatsapp_number",
+              postgresql_using="gin", postgresql_ops={"whatsapp_number": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
     )
 
 
@@ -98,6 +109,8 @@ class Vehicle(Base, TimestampMixin):
     __table_args__ = (
         UniqueConstraint("registration", name="uq_vehicle_registration"),
         Index("ix_vehicle_registration", "registration"),
+        Index("ix_vehicle_registration_trgm", "registration",
+              postgresql_using="gin", postgresql_ops={"registration": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
     )
 
 
@@ -125,16 +138,74 @@ class Booking(Base, TimestampMixin):
     checked_in_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     collected_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
+    # Denormalized from booking_notes so lists can show notes without loading them
+    note_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    last_note: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_note_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
     customer: Mapped["Customer"] = relationship(back_populates="bookings")
     vehicle: Mapped["Vehicle"] = relationship(back_populates="bookings")
     audit_logs: Mapped[list["AuditLog"]] = relationship(back_populates="booking", cascade="all, delete-orphan")
+    notes: Mapped[list["BookingNote"]] = relationship(
+        back_populates="booking",
+        cascade="all, delete-orphan",
+        order_by="(BookingNote.created_at, BookingNote.id)",
+    )
 
     __table_args__ = (
         Index("ix_booking_status", "status"),
+        Index("ix_booking_created_at_id", "created_at", "id"),
+        Index("ix_booking_updated_at", "updated_at"),
         UniqueConstraint("source", "source_row_id", name="uq_booking_source_row"),
     )
 
 
+# ---------- Partial indexes ----------
+# Operational queries only touch a few statuses while most rows are COLLECTED,
+# so these indexes cover just the rows those queries read.
+def _partial_index(name: str, column, *statuses: BookingStatus) -> Index:
+    condition = Booking.status == statuses[0] if len(statuses) == 1 else Booking.status.in_(statuses)
+    return Index(name, column, postgresql_where=condition, sqlite_where=condition)
+
+
+# Overstay sweep: ON_SITE bookings past pickup_at
+_partial_index("ix_booking_pickup_on_site", Booking.pickup_at, BookingStatus.on_site)
+# Cars on site ordered by check-in (get_on_site, dashboard)
+_partial_index(
+    "ix_booking_checked_in_on_site", Booking.checked_in_at, BookingStatus.on_site, BookingStatus.overstay
+)
+# Overstays ordered by pickup (get_overstays)
+_partial_index("ix_booking_pickup_overstay", Booking.pickup_at, BookingStatus.overstay)
+# Upcoming drop-offs (arrivals, capacity forecast)
+_partial_index("ix_booking_dropoff_booked", Booking.dropoff_at, BookingStatus.booked)
+# "Active" bookings as defined for the chat assistant
+_partial_index(
+    "ix_booking_dropoff_active",
+    Booking.dropoff_at,
+    BookingStatus.booked,
+    BookingStatus.on_site,
+    BookingStatus.overstay,
+)
+
+
+class BookingNote(Base):
+    __tablename__ = "booking_notes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    booking_id: Mapped[int] = mapped_column(ForeignKey("bookings.id"), nullable=False)
+    author_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+
+    booking: Mapped["Booking"] = relationship(back_populates="notes")
+    author: Mapped["User"] = relationship()
+
+    __table_args__ = (
+        Index("ix_booking_notes_booking_id_created_at", "booking_id", "created_at"),
+    )
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -146,7 +217,49 @@ class AuditLog(Base):
 
     event_type: Mapped[AuditEventType] = mapped_column(Enum(AuditEventType), nullable=False)
     message: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    meta_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Structured event details, e.g. {"fields": [...], "before": {...}, "after": {...}};
+    # JSONB on PostgreSQL, JSON text elsewhere
+    meta_json: Mapped[dict | None] = mapped_column(
+        JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"), nullable=True
+    )
 
     booking: Mapped["Booking"] = relationship(back_populates="audit_logs")
     actor: Mapped["User"] = relationship(back_populates="audit_logs")
+
+    __table_args__ = (
+        Index("ix_audit_logs_created_at", "created_at"),
+        # Containment queries on meta_json (jsonb @>); plain index elsewhere
+        Index("ix_audit_logs_meta_json", "meta_json", postgresql_using="gin"),
+    )
+
+
+class BookingTombstone(Base):
+    """Record of a deleted booking so polling clients can drop it locally."""
+    __tablename__ = "booking_tombstones"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    booking_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class DailyRevenue(Base):
+    """
+    Revenue rollup per local booking date, flight type and payment method.
+    Maintained incrementally by RevenueRollupService; cancelled and no-show
+    bookings are excluded.
+    """
+    __tablename__ = "daily_revenue"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    flight_type: Mapped[FlightType] = mapped_column(Enum(FlightType), nullable=False)
+    payment_method: Mapped[PaymentMethod] = mapped_column(Enum(PaymentMethod), nullable=False)
+    booking_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    revenue: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint("day", "flight_type", "payment_method", name="uq_daily_revenue_key"),
+    )
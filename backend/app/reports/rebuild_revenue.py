@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Standalone script to rebuild the daily revenue rollup from the bookings table.
+
+The rollup is normally maintained incrementally, and create_tables fills it
+when it is empty (first start after it was added); run this after bulk
+changes made outside the application (e.g. raw SQL).
+
+Usage:
+    # From backend directory:
+    python -m app.reports.rebuild_revenue
+"""
+import sys
+from pathlib import Path
+
+# Add backend directory to path to allow imports
+backend_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.reports.revenue_rollup import RevenueRollupService
+from app.db import SessionLocal, create_tables
+
+
+def main():
+    """Main entry point for the revenue rollup rebuild script"""
+    print("Rebuilding daily revenue rollup")
+    print("-" * 60)
+    
+    # Ensure tables exist
+    create_tables()
+    
+    db = SessionLocal()
+    
+    try:
+        row_count = RevenueRollupService.rebuild(db)
+        print(f"Rollup rows written: {row_count}")
+        print("\n" + "-" * 60)
+        print("Rebuild finished successfully!")
+    except Exception as e:
+        db.rollback()
+        print(f"\nError during rebuild: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
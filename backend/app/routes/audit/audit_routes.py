@@ -0,0 +1,98 @@
+import json
+from datetime import datetime
+from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from ...config import settings
+from ...models import AuditLog, AuditEventType
+from ...services.audit.audit_service import AuditService
+from ...services.bookings.pagination import encode_cursor
+from ...services.bookings.timezones import to_naive_utc
+from ...services.auth.dependencies import get_current_user
+
+router = APIRouter(
+    prefix="/api/audit",
+    tags=["Audit"],
+    dependencies=[Depends(get_current_user)]
+    )
+
+
+def audit_log_to_out(log: AuditLog) -> dict:
+    """Convert audit log model to output format."""
+    return {
+        "id": str(log.id),
+        "bookingId": str(log.booking_id),
+        "eventType": log.event_type.value,
+        "message": log.message or "",
+        "meta": log.meta_json,
+        "timestamp": log.created_at.isoformat(),
+        "actorId": str(log.actor_user_id) if log.actor_user_id else None,
+        "user": log.actor.full_name if log.actor else "System",
+    }
+
+
+@router.get("", response_model=dict)
+def get_audit_logs(
+    actor_id: Optional[int] = Query(None, description="Only events by this user"),
+    event_type: Optional[List[str]] = Query(None, description="Event types (repeatable)"),
+    booking_id: Optional[int] = Query(None, description="Only events for this booking"),
+    start: Optional[datetime] = Query(None, description="Events at or after this UTC time"),
+    end: Optional[datetime] = Query(None, description="Events before this UTC time"),
+    changed: Optional[List[str]] = Query(None, description="Changed fields, e.g. status (repeatable)"),
+    meta: Optional[str] = Query(None, description='JSON object meta must contain, e.g. {"after":{"status":"CANCELLED"}}'),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    page_size: Optional[int] = Query(None, ge=1, le=settings.BOOKINGS_MAX_PAGE_SIZE, description="Events per page"),
+    db: Session = Depends(get_db),
+):
+    """
+    Query audit logs, newest first, one page at a time:
+    {"items": [...], "next_cursor": str | None, "page_size": int}.
+    Pass next_cursor back as cursor to fetch the following page.
+    """
+    event_types = []
+    for value in event_type or []:
+        try:
+            event_types.append(AuditEventType[value.lower()])
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Invalid event type: {value}")
+
+    meta_pattern = None
+    if meta:
+        try:
+            meta_pattern = json.loads(meta)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="meta must be valid JSON")
+        if not isinstance(meta_pattern, dict):
+            raise HTTPException(status_code=400, detail="meta must be a JSON object")
+
+    page_size = page_size or settings.BOOKINGS_PAGE_SIZE
+    try:
+        logs = AuditService.query(
+            db,
+            actor_user_id=actor_id,
+            event_types=event_types,
+            booking_id=booking_id,
+            start=to_naive_utc(start) if start else None,
+            end=to_naive_utc(end) if end else None,
+            changed_fields=changed,
+            meta=meta_pattern,
+            cursor=cursor,
+            limit=page_size + 1,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    has_more = len(logs) > page_size
+    logs = logs[:page_size]
+    next_cursor = None
+    if has_more and logs:
+        last = logs[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return {
+        "items": [audit_log_to_out(log) for log in logs],
+        "next_cursor": next_cursor,
+        "page_size": page_size,
+    }
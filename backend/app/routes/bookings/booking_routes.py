@@ -1,19 +1,31 @@
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from pydantic import BaseModel
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional, List, Union, Iterable, Iterator, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.db import get_db
+from app.config import settings
 from ...shemas import BookingUpdate
-from ...models import Booking as BookingModel, BookingStatus as BookingStatusEnum, FlightType as FlightTypeEnum, PaymentMethod as PaymentMethodEnum
+from ...models import Booking as BookingModel, BookingNote as BookingNoteModel, BookingStatus as BookingStatusEnum, FlightType as FlightTypeEnum, PaymentMethod as PaymentMethodEnum
 from ...services.bookings.booking_service import BookingService
 from ...services.bookings.booking_operations import BookingOperationsService
+from ...services.bookings.pagination import encode_cursor
+from ...services.bookings.timezones import local_today, local_day_bounds, local_day_bounds_utc, to_naive_utc
 from ...services.auth.dependencies import get_current_user
 
 class NoteRequest(BaseModel):
     """Request model for adding a note."""
     note: str
 
+
+class BulkActionRequest(BaseModel):
+    """Request model for bulk booking actions."""
+    ids: List[int] = Field(min_length=1, max_length=500)
+
 router = APIRouter(
     prefix="/api/bookings", 
     tags=["Bookings"],
@@ -21,12 +33,40 @@ router = APIRouter(
     )
 
 
+def make_etag(version: str, variant: str = "") -> str:
+    """Build a weak ETag from a data version and the representation variant (e.g. query string)."""
+    digest = hashlib.sha1(f"{version}|{variant}".encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def etag_headers(etag: str) -> dict:
+    """Headers telling clients to revalidate cached responses with the ETag."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def split_make_model(make_model: str) -> tuple[str, str]:
+    """Split the combined vehicle make/model string into (make, model)."""
+    make_model_parts = make_model.split(" ", 1)
+    vehicle_make = make_model_parts[0] if make_model_parts else ""
+    vehicle_model = make_model_parts[1] if len(make_model_parts) > 1 else ""
+    return vehicle_make, vehicle_model
+
+
 def booking_to_out(booking: BookingModel) -> dict:
     """Convert booking model to output format matching frontend expectations."""
     # Parse vehicle make/model (stored as combined string)
-    make_model_parts = booking.vehicle.make_model.split(" ", 1)
-    vehicle_make = make_model_parts[0] if make_model_parts else ""
-    vehicle_model = make_model_parts[1] if len(make_model_parts) > 1 else ""
+    vehicle_make, vehicle_model = split_make_model(booking.vehicle.make_model)
     
     # Format dates and times
     departure_date = booking.dropoff_at.date()
@@ -45,8 +85,11 @@ def booking_to_out(booking: BookingModel) -> dict:
             "NOTE": "note_added",
             "STATUS_CHANGE": "status_changed",
             "SYNC": "created",
+            "UPDATED": "updated",
         }
         activity_type = event_type_map.get(log.event_type.value, "created")
+        if log.event_type.value == "NOTE" and (log.meta_json or {}).get("action") == "deleted":
+            activity_type = "note_deleted"
         
         activity.append({
             "id": str(log.id),
@@ -56,12 +99,7 @@ def booking_to_out(booking: BookingModel) -> dict:
             "user": log.actor.full_name if log.actor else "System",
         })
     
-    # Extract notes from audit logs
-    notes = [
-        log.message.replace("Note added: ", "")
-        for log in booking.audit_logs
-        if log.event_type.value == "NOTE" and log.message
-    ]
+    notes = [note.body for note in booking.notes]
     
     return {
         "id": str(booking.id),
@@ -87,22 +125,102 @@ def booking_to_out(booking: BookingModel) -> dict:
         "collectedTime": booking.collected_at.isoformat() if booking.collected_at else None,
         "activity": activity,
         "notes": notes,
+        "noteCount": booking.note_count,
+        "lastNote": booking.last_note,
+    }
+
+
+def summary_to_out(row) -> dict:
+    """
+    Convert a summary row from BookingService.get_summaries to the list
+    output format. Same fields as booking_to_out without activity and notes;
+    noteCount and lastNote come from the denormalized booking columns.
+    """
+    vehicle_make, vehicle_model = split_make_model(row.make_model)
+    return {
+        "id": str(row.id),
+        "customerId": str(row.customer_id),
+        "timestamp": row.created_at.isoformat(),
+        "fullName": row.full_name,
+        "email": row.email or "",
+        "whatsapp": row.whatsapp_number or "",
+        "flightType": row.flight_type.value.upper(),
+        "departureDate": row.dropoff_at.date().isoformat(),
+        "departureTime": row.dropoff_at.strftime("%H:%M"),
+        "arrivalDate": row.pickup_at.date().isoformat(),
+        "arrivalTime": row.pickup_at.strftime("%H:%M"),
+        "vehicleMake": vehicle_make,
+        "vehicleModel": vehicle_model,
+        "vehicleColor": row.color or "",
+        "registration": row.registration,
+        "paymentMethod": row.payment_method.value.upper(),
+        "specialInstructions": row.special_instructions or "",
+        "cost": float(row.cost),
+        "status": row.status.value,
+        "checkInTime": row.checked_in_at.isoformat() if row.checked_in_at else None,
+        "collectedTime": row.collected_at.isoformat() if row.collected_at else None,
+        "noteCount": row.note_count,
+        "lastNote": row.last_note,
+    }
+
+
+def note_to_out(note: BookingNoteModel) -> dict:
+    """Convert booking note model to output format."""
+    return {
+        "id": str(note.id),
+        "bookingId": str(note.booking_id),
+        "body": note.body,
+        "timestamp": note.created_at.isoformat(),
+        "user": note.author.full_name if note.author else "System",
     }
 
 
-@router.get("", response_model=List[dict])
+def stream_bookings_json(bookings: Iterable[BookingModel]) -> Iterator[str]:
+    """Serialize bookings as a JSON array one element at a time."""
+    yield "["
+    for index, booking in enumerate(bookings):
+        if index:
+            yield ","
+        yield json.dumps(booking_to_out(booking))
+    yield "]"
+
+
+@router.get("", response_model=Union[List[dict], dict])
 def get_bookings(
+    request: Request,
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status"),
     payment_method: Optional[str] = Query(None, description="Filter by payment method"),
     flight_type: Optional[str] = Query(None, description="Filter by flight type"),
     search: Optional[str] = Query(None, description="Search in name, email, phone, or registration"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    page_size: Optional[int] = Query(
+        None, ge=1, le=settings.BOOKINGS_MAX_PAGE_SIZE, description="Number of bookings per page"
+    ),
+    stream: bool = Query(False, description="Stream the full list as it is read from the database"),
+    view: Literal["full", "summary"] = Query("full", description="'summary' omits activity and notes"),
     db: Session = Depends(get_db),
 ):
     """
     Get all bookings with optional filters.
     
-    Returns all bookings matching the filters (no pagination limit).
-    Frontend handles pagination client-side.
+    Without cursor/page_size, returns all bookings matching the filters and
+    the frontend handles pagination client-side. Search results are ordered
+    by relevance, then recency.
+
+    With cursor or page_size, returns one page ordered by most recent first:
+    {"items": [...], "next_cursor": str | None, "page_size": int}.
+    Pass next_cursor back as cursor to fetch the following page.
+
+    With stream=true (full view, no pagination), the list is read in chunks
+    and written to the response incrementally instead of being built in memory.
+
+    With view=summary, only the columns list views display are selected:
+    activity and notes are omitted and can be fetched per booking from
+    GET /api/bookings/{id}.
+
+    Responses carry an ETag; polls sending it back in If-None-Match get
+    304 Not Modified while the bookings data is unchanged.
     """
     # Convert string filters to enums
     status_enum = None
@@ -126,8 +244,60 @@ def get_bookings(
         except KeyError:
             raise HTTPException(status_code=400, detail=f"Invalid flight type: {flight_type}")
     
+    etag = make_etag(BookingService.get_data_version(db), str(request.url.query))
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=etag_headers(etag))
+    response.headers.update(etag_headers(etag))
+
+    summary = view == "summary"
+    fetch = BookingService.get_summaries if summary else BookingService.get_all
+    to_out = summary_to_out if summary else booking_to_out
+
+    if cursor or page_size:
+        page_size = page_size or settings.BOOKINGS_PAGE_SIZE
+        try:
+            # Fetch one extra row to know whether another page exists
+            bookings = fetch(
+                db=db,
+                status=status_enum,
+                payment_method=payment_enum,
+                flight_type=flight_enum,
+                search=search,
+                limit=page_size + 1,
+                cursor=cursor,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        has_more = len(bookings) > page_size
+        bookings = bookings[:page_size]
+        next_cursor = None
+        if has_more:
+            last = bookings[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+        return {
+            "items": [to_out(booking) for booking in bookings],
+            "next_cursor": next_cursor,
+            "page_size": page_size,
+        }
+
+    if stream and not summary:
+        bookings = BookingService.iter_all(
+            db=db,
+            status=status_enum,
+            payment_method=payment_enum,
+            flight_type=flight_enum,
+            search=search,
+            chunk_size=settings.BOOKINGS_STREAM_CHUNK_SIZE,
+            ranked=True,
+        )
+        return StreamingResponse(
+            stream_bookings_json(bookings), media_type="application/json", headers=etag_headers(etag)
+        )
+
     # Get all bookings without pagination limit
-    bookings = BookingService.get_all(
+    bookings = fetch(
         db=db,
         status=status_enum,
         payment_method=payment_enum,
@@ -135,14 +305,107 @@ def get_bookings(
         search=search,
         skip=0,
         limit=10000, 
+        ranked=True,
     )
     
-    return [booking_to_out(booking) for booking in bookings]
+    return [to_out(booking) for booking in bookings]
+
+
+@router.get("/stats", response_model=dict)
+def get_booking_stats(
+    tz: Optional[str] = Query(None, description="IANA timezone used to define 'today'"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get dashboard KPI counts: cars on site, drop-offs today, pickups today,
+    overstays and bookings created today.
+    """
+    try:
+        today = local_today(tz)
+        utc_start, utc_end = local_day_bounds_utc(today, tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    local_start, local_end = local_day_bounds(today)
+    stats = BookingService.get_dashboard_stats(db, local_start, local_end, utc_start, utc_end)
+    return {
+        "date": today.isoformat(),
+        "carsOnSite": stats["cars_on_site"],
+        "arrivalsToday": stats["arrivals_today"],
+        "pickupsToday": stats["pickups_today"],
+        "overstays": stats["overstays"],
+        "bookedToday": stats["booked_today"],
+    }
+
+
+@router.get("/changes", response_model=dict)
+def get_booking_changes(
+    since: datetime = Query(..., description="Watermark returned by the previous sync"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get bookings changed or deleted after a watermark.
+
+    Returns {"bookings": [...], "deleted": [ids], "watermark": str}. Pass the
+    returned watermark as `since` on the next poll. Consecutive polls overlap
+    by BOOKINGS_SYNC_LAG_SECONDS, so clients should dedupe by id and updatedAt.
+    """
+    # updated_at (and audit created_at) are stamped when the statement runs, not
+    # at commit, so a transaction still open now can commit rows stamped before
+    # this poll. Hold the watermark back by more than the longest write
+    # transaction (and the audit flush interval) so those rows are re-read.
+    watermark = datetime.utcnow() - timedelta(seconds=settings.BOOKINGS_SYNC_LAG_SECONDS)
+    since_utc = to_naive_utc(since)
+
+    bookings = BookingService.get_changed_since(db, since_utc)
+    deleted = BookingService.get_deleted_since(db, since_utc)
+
+    return {
+        "bookings": [booking_to_out(booking) for booking in bookings],
+        "deleted": [str(booking_id) for booking_id in deleted],
+        "watermark": watermark.isoformat(),
+    }
+
+
+def bulk_results_to_out(results: dict) -> dict:
+    """Convert per-ID bulk action results to output format."""
+    items = [
+        {"id": str(booking_id), "success": error is None, "error": error}
+        for booking_id, error in results.items()
+    ]
+    updated = sum(1 for item in items if item["success"])
+    return {"results": items, "updated": updated, "failed": len(items) - updated}
+
+
+@router.post("/bulk/check-in", response_model=dict)
+def bulk_check_in_bookings(request: BulkActionRequest, db: Session = Depends(get_db)):
+    """Check in several bookings at once (BOOKED -> ON_SITE)."""
+    results = BookingOperationsService.bulk_check_in(db, request.ids)
+    return bulk_results_to_out(results)
+
+
+@router.post("/bulk/collect", response_model=dict)
+def bulk_collect_bookings(request: BulkActionRequest, db: Session = Depends(get_db)):
+    """Mark several bookings as collected at once (ON_SITE/OVERSTAY -> COLLECTED)."""
+    results = BookingOperationsService.bulk_collect(db, request.ids)
+    return bulk_results_to_out(results)
 
 
 @router.get("/{booking_id}", response_model=dict)
-def get_booking(booking_id: int, db: Session = Depends(get_db)):
-    """Get a single booking by ID."""
+def get_booking(booking_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Get a single booking by ID.
+
+    Supports conditional requests via ETag / If-None-Match.
+    """
+    version = BookingService.get_booking_version(db, booking_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    etag = make_etag(version)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=etag_headers(etag))
+    response.headers.update(etag_headers(etag))
+
     booking = BookingService.get_by_id(db, booking_id)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
@@ -185,7 +448,11 @@ def update_booking_status(
     except KeyError:
         raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
     
-    booking = BookingOperationsService.update_status(db, booking_id, status_enum)
+    try:
+        booking = BookingOperationsService.update_status(db, booking_id, status_enum)
+    except ValueError as e:
+        # Lost the compare-and-set race on every attempt
+        raise HTTPException(status_code=409, detail=str(e))
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
     return booking_to_out(booking)
@@ -207,6 +474,31 @@ def add_booking_note(
     return booking_to_out(booking)
 
 
+@router.get("/{booking_id}/notes", response_model=List[dict])
+def get_booking_notes(booking_id: int, db: Session = Depends(get_db)):
+    """Get a booking's notes, oldest first."""
+    if BookingService.get_booking_version(db, booking_id) is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return [note_to_out(note) for note in BookingService.get_notes(db, booking_id)]
+
+
+@router.delete("/{booking_id}/notes/{note_id}", response_model=dict)
+def delete_booking_note(booking_id: int, note_id: int, db: Session = Depends(get_db)):
+    """Delete a note from a booking."""
+    if not BookingOperationsService.delete_note(db, booking_id, note_id):
+        raise HTTPException(status_code=404, detail="Note not found")
+    return {"message": "Note deleted", "id": str(note_id)}
+
+
+@router.delete("/{booking_id}", response_model=dict)
+def delete_booking(booking_id: int, db: Session = Depends(get_db)):
+    """Delete a booking and its audit trail."""
+    booking = BookingOperationsService.delete_booking(db, booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return {"message": "Booking deleted", "id": str(booking_id)}
+
+
 @router.post("/{booking_id}/update", response_model=dict)
 def update_booking(
     booking_id: int,
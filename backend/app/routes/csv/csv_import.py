@@ -1,25 +1,40 @@
 """
 CSV Import API Routes
 
-Endpoint for uploading and importing CSV booking data.
+Endpoints for uploading CSV booking data and following the background import.
 """
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import Dict
 
-from ...db import get_db
-from ...services.csv_importer import CSVImporter, CSVImportError
+from ...services.csv_import_jobs import ImportJobService
 
 router = APIRouter(prefix="/api/csv", tags=["CSV Import"])
 
+REQUIRED_COLUMNS = [
+    "Timestamp",
+    "Full Names",
+    "Email",
+    "WhatsApp number",
+    "Type of Flight",
+    "Departure Date",
+    "Vehicle Drop off Time",
+    "Arrival Date",
+    "Vehicle Pick -up Time",
+    "Vehicle Make and Model",
+    "Vehicle Color",
+    "Vehicle Registration",
+    "Payment Method",
+    "Special Instructions",
+    "cost",
+]
 
-@router.post("/import", response_model=Dict)
-async def import_csv_file(
+
+@router.post("/import", response_model=Dict, status_code=202)
+def import_csv_file(
     file: UploadFile = File(..., description="CSV file containing booking data"),
-    db: Session = Depends(get_db),
 ):
     """
-    Upload and import a CSV file containing booking data.
+    Upload a CSV file containing booking data and import it in the background.
     
     The CSV file should have the following columns:
     - Timestamp
@@ -38,10 +53,9 @@ async def import_csv_file(
     - Special Instructions
     - cost
     
-    Returns statistics about the import process.
+    Returns a job ID immediately; poll /api/csv/import/{job_id} for rows
+    processed, throughput and errors so far.
     """
-    
-    print("Import CSV called")
     # Validate file type
     if not file.filename.endswith(('.csv', '.CSV')):
         raise HTTPException(
@@ -49,66 +63,38 @@ async def import_csv_file(
             detail="File must be a CSV file"
         )
     
-    try:
-        # Read file content
-        content = await file.read()
-        csv_content = content.decode('utf-8')
-        
-        # Create importer and import
-        importer = CSVImporter(db)
-        stats = importer.import_from_string(csv_content, source="api_upload")
-        
-        return {
-            "message": "Import completed",
-            "filename": file.filename,
-            "statistics": {
-                "total_rows": stats["total_rows"],
-                "successful": stats["successful"],
-                "failed": stats["failed"],
-                "skipped": stats["skipped"],
-            },
-            "errors": stats["errors"][:50] if stats["errors"] else [],  # Limit to 50 errors
-            "error_count": len(stats["errors"]),
-        }
-        
-    except CSVImportError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except UnicodeDecodeError:
-        raise HTTPException(
-            status_code=400,
-            detail="File encoding error. Please ensure the file is UTF-8 encoded."
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Unexpected error during import: {str(e)}"
-        )
+    job = ImportJobService.submit(file.file, file.filename, source="api_upload")
+    return {
+        "message": "Import started",
+        "job_id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        "status_url": f"{router.prefix}/import/{job.id}",
+    }
 
 
-@router.get("/import/status")
-async def get_import_status():
+@router.get("/import/status", response_model=Dict)
+def get_import_status():
     """
-    Get information about CSV import functionality.
+    Get the status of recent CSV import jobs, newest first.
     """
+    jobs = [job.to_dict() for job in ImportJobService.list_jobs()]
     return {
-        "message": "CSV import endpoint is available",
+        "active": sum(1 for job in jobs if job["status"] in ("queued", "running")),
+        "jobs": jobs,
         "supported_format": "CSV",
-        "required_columns": [
-            "Timestamp",
-            "Full Names",
-            "Email",
-            "WhatsApp number",
-            "Type of Flight",
-            "Departure Date",
-            "Vehicle Drop off Time",
-            "Arrival Date",
-            "Vehicle Pick -up Time",
-            "Vehicle Make and Model",
-            "Vehicle Color",
-            "Vehicle Registration",
-            "Payment Method",
-            "Special Instructions",
-            "cost",
-        ],
+        "required_columns": REQUIRED_COLUMNS,
     }
 
+
+@router.get("/import/{job_id}", response_model=Dict)
+def get_import_job(job_id: str):
+    """
+    Get progress of one import job: rows processed, throughput and errors
+    so far (first 50, with the total in error_count). The import commits at
+    the end, so imported rows show as uncommitted until it completes.
+    """
+    job = ImportJobService.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
@@ -0,0 +1,71 @@
+from typing import Optional, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from ...services.customers.customer_service import CustomerService
+from ...services.auth.dependencies import get_current_user
+
+router = APIRouter(
+    prefix="/api/customers",
+    tags=["Customers"],
+    dependencies=[Depends(get_current_user)]
+    )
+
+
+def customer_to_out(row) -> dict:
+    """Convert a customer directory row to output format matching frontend expectations."""
+    return {
+        "id": str(row.id),
+        "fullName": row.full_name,
+        "email": row.email or "",
+        "whatsapp": row.whatsapp_number or "",
+        "createdAt": row.created_at.isoformat(),
+        "bookingCount": int(row.booking_count),
+        "totalSpend": float(row.total_spend),
+        "lastBookingAt": row.last_booking_at.isoformat() if row.last_booking_at else None,
+        "cancelledCount": int(row.cancelled_count),
+        "noShowCount": int(row.no_show_count),
+        "isRepeat": row.booking_count > 1,
+    }
+
+
+@router.get("", response_model=dict)
+def get_customers(
+    search: Optional[str] = Query(None, description="Search in name, email, or phone"),
+    filter: Literal["all", "repeat", "cancelled"] = Query("all", description="Customer filter"),
+    sort_by: Literal["name", "booking_count", "total_spend", "last_booking_at", "created_at"] = Query(
+        "last_booking_at", description="Sort field"
+    ),
+    order: Literal["asc", "desc"] = Query("desc", description="Sort direction"),
+    page: int = Query(1, ge=1, description="Page number (1-based)"),
+    page_size: int = Query(20, ge=1, le=200, description="Customers per page"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get the customer directory with booking statistics.
+    
+    Returns {"items": [...], "total", "page", "page_size", "repeatCount",
+    "cancelledCount"}; counts reflect the current search and filter.
+    """
+    try:
+        rows, summary = CustomerService.get_directory(
+            db=db,
+            search=search,
+            customer_filter=filter,
+            sort_by=sort_by,
+            descending=order == "desc",
+            skip=(page - 1) * page_size,
+            limit=page_size,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "items": [customer_to_out(row) for row in rows],
+        "total": summary["total"],
+        "page": page,
+        "page_size": page_size,
+        "repeatCount": summary["repeat"],
+        "cancelledCount": summary["cancelled_or_no_show"],
+    }
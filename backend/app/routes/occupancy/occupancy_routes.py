@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.config import settings
+from ...services.occupancy.occupancy_service import OccupancyService
+from ...services.occupancy.forecast import CapacityForecastService
+from ...services.bookings.timezones import local_today, to_naive_utc
+from ...services.auth.dependencies import get_current_user
+
+router = APIRouter(
+    prefix="/api/occupancy",
+    tags=["Occupancy"],
+    dependencies=[Depends(get_current_user)]
+    )
+
+
+@router.get("", response_model=dict)
+def get_occupancy(
+    at: Optional[datetime] = Query(None, description="Point in time (default: now)"),
+    db: Session = Depends(get_db),
+):
+    """Get the number of cars on site at a point in time."""
+    at_utc = to_naive_utc(at) if at else datetime.utcnow()
+    return {
+        "at": at_utc.isoformat(),
+        "carsOnSite": OccupancyService.get_occupancy_at(db, at_utc),
+    }
+
+
+@router.get("/daily", response_model=dict)
+def get_daily_occupancy(
+    start: Optional[date] = Query(None, description="First local date (default: today)"),
+    end: Optional[date] = Query(None, description="Last local date (default: 6 days after start)"),
+    tz: Optional[str] = Query(None, description="IANA timezone defining the days"),
+    db: Session = Depends(get_db),
+):
+    """Get peak and start-of-day occupancy per local day."""
+    try:
+        start = start or local_today(tz)
+        end = end or start + timedelta(days=6)
+        if start > end:
+            raise ValueError("start must be on or before end")
+        if (end - start).days >= settings.OCCUPANCY_MAX_DAYS:
+            raise ValueError(f"Range cannot exceed {settings.OCCUPANCY_MAX_DAYS} days")
+        days = OccupancyService.get_daily_peaks(db, start, end, tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": [
+            {"date": day["date"].isoformat(), "peak": day["peak"], "startOfDay": day["start_of_day"]}
+            for day in days
+        ],
+    }
+
+
+@router.get("/forecast", response_model=dict)
+def get_occupancy_forecast(
+    days: int = Query(30, ge=1, le=90, description="Number of days to forecast"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get expected cars on site per hour for the next `days` days.
+    
+    `expected` weights future bookings by their flight type's historical show
+    rate; `booked` counts every booking. Hour i starts at `start` + i hours,
+    in local time (the configured TIMEZONE).
+    """
+    forecast = CapacityForecastService.get_forecast(db, days)
+    return {
+        "start": forecast["start"].isoformat(),
+        "days": forecast["days"],
+        "intervalMinutes": 60,
+        "expected": forecast["expected"],
+        "booked": forecast["booked"],
+        "peakAt": forecast["peak_at"].isoformat(),
+        "peakExpected": forecast["peak_expected"],
+        "showRates": forecast["show_rates"],
+    }
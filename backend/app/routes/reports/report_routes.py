@@ -0,0 +1,80 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Optional, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from ...models import FlightType as FlightTypeEnum, PaymentMethod as PaymentMethodEnum
+from ...services.reports.revenue_rollup import RevenueRollupService
+from ...services.bookings.timezones import local_today
+from ...services.auth.dependencies import get_current_user
+
+router = APIRouter(
+    prefix="/api/reports",
+    tags=["Reports"],
+    dependencies=[Depends(get_current_user)]
+    )
+
+
+@router.get("/revenue", response_model=dict)
+def get_revenue_report(
+    start: Optional[date] = Query(None, description="First local date (default: 29 days before end)"),
+    end: Optional[date] = Query(None, description="Last local date (default: today)"),
+    group_by: Literal["day", "month"] = Query("day", description="Bucket size"),
+    flight_type: Optional[str] = Query(None, description="Filter by flight type"),
+    payment_method: Optional[str] = Query(None, description="Filter by payment method"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get revenue per day or month from the daily revenue rollup.
+    
+    Cancelled and no-show bookings are excluded. Bookings are bucketed by the
+    local date they were created.
+    """
+    flight_enum = None
+    if flight_type and flight_type != "all":
+        try:
+            flight_enum = FlightTypeEnum[flight_type.lower()]
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Invalid flight type: {flight_type}")
+
+    payment_enum = None
+    if payment_method and payment_method != "all":
+        try:
+            payment_enum = PaymentMethodEnum[payment_method.lower()]
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Invalid payment method: {payment_method}")
+
+    end = end or local_today()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+
+    rows = RevenueRollupService.get_daily(db, start, end, flight_enum, payment_enum)
+
+    buckets = defaultdict(lambda: {"revenue": 0.0, "bookings": 0})
+    by_flight_type = defaultdict(float)
+    by_payment_method = defaultdict(float)
+    for row in rows:
+        bucket = row.day if group_by == "day" else row.day.replace(day=1)
+        buckets[bucket]["revenue"] += float(row.revenue)
+        buckets[bucket]["bookings"] += row.booking_count
+        by_flight_type[row.flight_type.value.upper()] += float(row.revenue)
+        by_payment_method[row.payment_method.value.upper()] += float(row.revenue)
+
+    series = [
+        {"date": bucket.isoformat(), **values}
+        for bucket, values in sorted(buckets.items())
+    ]
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "group_by": group_by,
+        "series": series,
+        "totalRevenue": sum(point["revenue"] for point in series),
+        "totalBookings": sum(point["bookings"] for point in series),
+        "byFlightType": dict(by_flight_type),
+        "byPaymentMethod": dict(by_payment_method),
+    }
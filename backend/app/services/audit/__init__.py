@@ -0,0 +1 @@
+# Audit services package
@@ -0,0 +1,148 @@
+"""
+Audit log service: structured change details and audit queries.
+"""
+import enum
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, List, Any, Dict
+
+from sqlalchemy import and_, tuple_, exists, func, select, literal
+from sqlalchemy.orm import Session, joinedload
+
+from ...models import AuditLog, AuditEventType
+from ..bookings.pagination import decode_cursor
+
+
+def json_value(value: Any) -> Any:
+    """Convert a model attribute value to a JSON-friendly value."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def change_meta(before: Dict[str, Any], after: Dict[str, Any]) -> Optional[dict]:
+    """
+    Structured before/after details for the fields whose value changed.
+
+    Returns:
+        {"fields": [...], "before": {...}, "after": {...}} or None if
+        nothing changed
+    """
+    fields = [
+        field for field in after
+        if json_value(before.get(field)) != json_value(after[field])
+    ]
+    if not fields:
+        return None
+    return {
+        "fields": fields,
+        "before": {field: json_value(before.get(field)) for field in fields},
+        "after": {field: json_value(after[field]) for field in fields},
+    }
+
+
+def _flatten(value: Any, path: str = "$") -> List[tuple]:
+    """(JSON path, leaf value) pairs of a containment pattern."""
+    if isinstance(value, dict):
+        pairs = []
+        for key, item in value.items():
+            pairs.extend(_flatten(item, f'{path}."{key}"'))
+        return pairs
+    return [(path, value)]
+
+
+def meta_contains(pattern: dict, dialect_name: str):
+    """
+    Filter for audit logs whose meta_json contains pattern.
+
+    On PostgreSQL this is jsonb containment (@>), served by the GIN index.
+    Elsewhere each leaf is compared with json_extract; list leaves match when
+    every listed value is an element of the stored array.
+    """
+    if dialect_name == "postgresql":
+        return AuditLog.meta_json.contains(pattern)
+
+    conditions = []
+    for path, value in _flatten(pattern):
+        values = value if isinstance(value, list) else None
+        if values is None:
+            conditions.append(func.json_extract(AuditLog.meta_json, path) == value)
+            continue
+        for item in values:
+            elements = func.json_each(AuditLog.meta_json, path).table_valued("value")
+            conditions.append(exists(select(literal(1)).select_from(elements).where(elements.c.value == item)))
+    return and_(*conditions)
+
+
+class AuditService:
+    """Service for querying audit logs."""
+
+    @staticmethod
+    def query(
+        db: Session,
+        actor_user_id: Optional[int] = None,
+        event_types: Optional[List[AuditEventType]] = None,
+        booking_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        changed_fields: Optional[List[str]] = None,
+        meta: Optional[dict] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[AuditLog]:
+        """
+        Get audit logs, newest first, with keyset pagination.
+
+        Args:
+            db: Database session
+            actor_user_id: Only events by this user
+            event_types: Only events of these types
+            booking_id: Only events for this booking
+            start: Only events at or after this naive UTC time
+            end: Only events before this naive UTC time
+            changed_fields: Only changes touching all of these fields
+            meta: Only events whose meta_json contains this object
+            cursor: Opaque cursor from the previous page
+            limit: Maximum number of records to return
+
+        Returns:
+            List of audit logs; fetch limit + 1 to detect a next page
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        dialect_name = db.get_bind().dialect.name
+        query = db.query(AuditLog).options(joinedload(AuditLog.actor))
+
+        if actor_user_id is not None:
+            query = query.filter(AuditLog.actor_user_id == actor_user_id)
+        if event_types:
+            query = query.filter(AuditLog.event_type.in_(event_types))
+        if booking_id is not None:
+            query = query.filter(AuditLog.booking_id == booking_id)
+        if start:
+            query = query.filter(AuditLog.created_at >= start)
+        if end:
+            query = query.filter(AuditLog.created_at < end)
+        if changed_fields:
+            query = query.filter(meta_contains({"fields": changed_fields}, dialect_name))
+        if meta:
+            query = query.filter(meta_contains(meta, dialect_name))
+
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(AuditLog.created_at, AuditLog.id) < tuple_(cursor_created_at, cursor_id),
+                # Plain bound so PostgreSQL can prune newer partitions
+                AuditLog.created_at <= cursor_created_at,
+            )
+
+        return (
+            query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+            .limit(limit)
+            .all()
+        )
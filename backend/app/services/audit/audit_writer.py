@@ -0,0 +1,287 @@
+"""
+Batched audit log writer.
+
+High-volume writers (bulk actions, overstay sweeps, imports) hand their audit
+events to the writer instead of inserting them in the request transaction.
+Events are queued only once the caller's transaction commits, and a
+background thread flushes them with multi-row INSERTs when the buffer
+reaches AUDIT_BATCH_SIZE or every AUDIT_FLUSH_SECONDS.
+
+Batches that cannot be written (database down, shutdown timeout) are
+appended to a JSON-lines spool file and replayed on the next start, so
+events survive restarts. The spool is shared by all server processes and
+guarded by an exclusive lock on a sidecar ".lock" file, so exactly one
+process replays it. When the writer is not running (scripts, the CSV import
+CLI) events are inserted synchronously in the caller's transaction.
+
+Events are held in memory between commit and flush (up to
+AUDIT_FLUSH_SECONDS), and only a graceful stop_audit_writer spools them: if
+the process crashes or is killed, those events are lost. Set
+AUDIT_ASYNC_ENABLED to False where every audit row must be written in the
+request transaction.
+"""
+import fcntl
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Iterable
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...db import SessionLocal
+from ...models import AuditLog, AuditEventType, Booking
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding events waiting for the transaction to commit
+PENDING_KEY = "pending_audit_events"
+
+_lock = threading.Lock()
+_buffer: List[dict] = []
+_wakeup = threading.Event()
+_stop_event = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def audit_event(
+    booking_id: int,
+    event_type: AuditEventType,
+    message: Optional[str] = None,
+    actor_user_id: Optional[int] = None,
+    meta_json: Optional[dict] = None,
+    created_at: Optional[datetime] = None,
+) -> dict:
+    """Build an audit event row for AuditWriter.record."""
+    return {
+        "booking_id": booking_id,
+        "actor_user_id": actor_user_id,
+        "event_type": event_type,
+        "message": message,
+        "meta_json": meta_json,
+        "created_at": created_at or datetime.utcnow(),
+    }
+
+
+class AuditWriter:
+    """Buffers audit events and writes them in batches."""
+
+    @staticmethod
+    def is_running() -> bool:
+        """Whether the background flush thread is active."""
+        return _thread is not None and _thread.is_alive()
+
+    @staticmethod
+    def record(db: Session, events: Iterable[dict], synchronous: bool = False) -> None:
+        """
+        Record audit events for the caller's transaction.
+
+        With the writer running, events are queued when the transaction
+        commits and dropped if it rolls back. Otherwise, or with synchronous
+        set, they are inserted right away as part of the transaction.
+
+        Args:
+            db: Session whose transaction the events belong to
+            events: Rows built with audit_event
+            synchronous: Insert now even when the writer is running; for
+                callers that already batch, such as bulk imports, so events
+                for a long transaction are not held in memory until commit
+        """
+        events = list(events)
+        if not events:
+            return
+        if AuditWriter.is_running() and not synchronous:
+            db.info.setdefault(PENDING_KEY, []).extend(events)
+        else:
+            db.execute(insert(AuditLog), events)
+
+    @staticmethod
+    def enqueue(events: List[dict]) -> None:
+        """Add committed events to the buffer, waking the flusher when full."""
+        with _lock:
+            _buffer.extend(events)
+            full = len(_buffer) >= settings.AUDIT_BATCH_SIZE
+        if full:
+            _wakeup.set()
+
+    @staticmethod
+    def flush() -> int:
+        """
+        Write all buffered events now. Batches that fail are spooled to disk.
+
+        Returns:
+            Number of events written to the database
+        """
+        with _lock:
+            events = _buffer[:]
+            _buffer.clear()
+        written = 0
+        for start in range(0, len(events), settings.AUDIT_BATCH_SIZE):
+            batch = events[start:start + settings.AUDIT_BATCH_SIZE]
+            try:
+                written += AuditWriter._write_batch(batch)
+            except Exception:
+                logger.exception("Audit flush failed, spooling %d event(s)", len(batch))
+                AuditWriter._spool(batch)
+        return written
+
+    @staticmethod
+    def _write_batch(batch: List[dict]) -> int:
+        """
+        Insert one batch in its own session. Events for bookings deleted in
+        the meantime are dropped rather than failing the whole batch.
+        """
+        db = SessionLocal()
+        try:
+            try:
+                db.execute(insert(AuditLog), batch)
+                db.commit()
+                return len(batch)
+            except IntegrityError:
+                db.rollback()
+                booking_ids = {item["booking_id"] for item in batch}
+                existing = set(
+                    db.execute(select(Booking.id).where(Booking.id.in_(booking_ids))).scalars()
+                )
+                kept = [item for item in batch if item["booking_id"] in existing]
+                if len(kept) < len(batch):
+                    logger.warning("Dropped %d audit event(s) for deleted bookings", len(batch) - len(kept))
+                if kept:
+                    db.execute(insert(AuditLog), kept)
+                    db.commit()
+                return len(kept)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _spool(batch: List[dict]) -> None:
+        """Append events to the spool file for replay on the next start."""
+        with _spool_lock():
+            AuditWriter._append_spool(batch)
+
+    @staticmethod
+    def _append_spool(batch: List[dict]) -> None:
+        """Append events to the spool file; the caller holds the spool lock."""
+        path = Path(settings.AUDIT_SPOOL_PATH)
+        with path.open("a", encoding="utf-8") as spool:
+            for item in batch:
+                spool.write(json.dumps({
+                    **item,
+                    "event_type": AuditEventType(item["event_type"]).name,
+                    "created_at": item["created_at"].isoformat(),
+                }) + "\n")
+
+    @staticmethod
+    def replay_spool() -> int:
+        """
+        Write events left in the spool file by an earlier run.
+
+        The spool lock is held throughout, so when several server processes
+        start together only the first replays the file and the others find
+        it gone. The file is removed once its events are written; on failure
+        it is rewritten with the events not written yet.
+
+        Returns:
+            Number of events written
+        """
+        path = Path(settings.AUDIT_SPOOL_PATH)
+        with _spool_lock():
+            if not path.exists():
+                return 0
+            events = []
+            with path.open(encoding="utf-8") as spool:
+                for line in spool:
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    item["event_type"] = AuditEventType[item["event_type"]]
+                    item["created_at"] = datetime.fromisoformat(item["created_at"])
+                    events.append(item)
+            written = 0
+            try:
+                for start in range(0, len(events), settings.AUDIT_BATCH_SIZE):
+                    written += AuditWriter._write_batch(events[start:start + settings.AUDIT_BATCH_SIZE])
+            except Exception:
+                logger.exception("Audit spool replay failed, keeping %s", path)
+                # Keep only what was not written yet
+                remaining = events[start:]
+                path.unlink()
+                AuditWriter._append_spool(remaining)
+                return written
+            path.unlink()
+            return written
+
+
+@contextmanager
+def _spool_lock():
+    """Hold an exclusive lock on the spool's sidecar lock file."""
+    lock_path = Path(settings.AUDIT_SPOOL_PATH + ".lock")
+    with lock_path.open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed_events(session: Session) -> None:
+    events = session.info.pop(PENDING_KEY, None)
+    if events:
+        AuditWriter.enqueue(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+def _run_flushes(interval_seconds: float) -> None:
+    """Flush loop run by the background thread until stopped."""
+    while not _stop_event.is_set():
+        _wakeup.wait(interval_seconds)
+        _wakeup.clear()
+        AuditWriter.flush()
+
+
+def start_audit_writer(interval_seconds: Optional[float] = None) -> None:
+    """Replay any spooled events and start the flush thread (no-op if running)."""
+    global _thread
+    if AuditWriter.is_running():
+        return
+    try:
+        replayed = AuditWriter.replay_spool()
+        if replayed:
+            logger.info("Replayed %d spooled audit event(s)", replayed)
+    except Exception:
+        logger.exception("Could not read audit spool")
+    _stop_event.clear()
+    _thread = threading.Thread(
+        target=_run_flushes,
+        args=(interval_seconds or settings.AUDIT_FLUSH_SECONDS,),
+        name="audit-writer",
+        daemon=True,
+    )
+    _thread.start()
+
+
+def stop_audit_writer() -> None:
+    """
+    Stop the flush thread and write what is still buffered. Anything that
+    cannot be written is spooled to disk.
+    """
+    global _thread
+    _stop_event.set()
+    _wakeup.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
+        _thread = None
+    AuditWriter.flush()
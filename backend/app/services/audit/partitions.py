@@ -0,0 +1,262 @@
+"""
+Monthly range partitioning of audit_logs on created_at (PostgreSQL only).
+
+The ORM keeps mapping AuditLog by id; on PostgreSQL, once converted by
+app.audit.maintain_partitions, the physical table is a partitioned parent
+with one partition per calendar month (audit_logs_pYYYYMM) plus
+audit_logs_default for rows outside every range.
+Partitioned tables need the partition key in the primary key, so the
+primary key there is (id, created_at); ids still come from one sequence.
+
+Old partitions are detached, written to gzip-compressed CSV files and
+dropped, so the live table only holds the retained months.
+"""
+import gzip
+import io
+import logging
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from ...models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+TABLE = AuditLog.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+class AuditPartition(NamedTuple):
+    """One monthly partition of audit_logs."""
+    name: str
+    month: date
+
+
+def month_start(value: date) -> date:
+    """First day of the month containing value."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month count months after month (count may be negative)."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding the given month."""
+    return f"{TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+class AuditPartitionService:
+    """Creates, lists and archives audit_logs partitions."""
+
+    @staticmethod
+    def is_partitioned(conn: Connection) -> bool:
+        """Whether audit_logs is already a partitioned table."""
+        return bool(conn.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+            ),
+            {"table": TABLE},
+        ).first())
+
+    @staticmethod
+    def list_partitions(conn: Connection) -> List[AuditPartition]:
+        """Monthly partitions currently attached, oldest first."""
+        names = conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)"
+            ),
+            {"table": TABLE},
+        ).scalars().all()
+
+        prefix = f"{TABLE}_p"
+        partitions = []
+        for name in names:
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+                partitions.append(AuditPartition(name, date(int(suffix[:4]), int(suffix[4:]), 1)))
+        return sorted(partitions, key=lambda partition: partition.month)
+
+    @staticmethod
+    def create_partition(conn: Connection, month: date) -> bool:
+        """
+        Create the partition for a month if it does not exist.
+
+        Rows for the month that already landed in the default partition
+        (maintenance ran late) would make CREATE ... PARTITION OF fail, so
+        in that case the default partition is detached, the month is
+        created, its rows are moved out of the default and the default is
+        attached again, all in the caller's transaction.
+
+        Returns:
+            True if the partition was created
+        """
+        name = partition_name(month)
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            return False
+
+        bounds = {"start": month, "end": add_months(month, 1)}
+        in_month = "created_at >= :start AND created_at < :end"
+        stranded = (
+            conn.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar() is not None
+            and conn.execute(
+                text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_month})"), bounds
+            ).scalar()
+        )
+        if stranded:
+            conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+
+        if stranded:
+            moved = conn.execute(
+                text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds
+            ).rowcount
+            conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds)
+            conn.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+            logger.warning("Moved %d row(s) from %s into %s", moved, DEFAULT_PARTITION, name)
+        return True
+
+    @staticmethod
+    def create_future_partitions(conn: Connection, months_ahead: int, today: Optional[date] = None) -> List[str]:
+        """
+        Make sure partitions exist from the current month through
+        months_ahead months ahead.
+
+        Takes a transaction-level advisory lock first, so server processes
+        starting together (and the maintenance script) create each
+        partition once instead of racing on it.
+
+        Returns:
+            Names of the partitions that were created
+        """
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"{TABLE}_partitions"})
+        current = month_start(today or datetime.utcnow().date())
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if AuditPartitionService.create_partition(conn, month):
+                created.append(partition_name(month))
+        return created
+
+    @staticmethod
+    def ensure_partitioned(engine: Engine, months_ahead: int) -> bool:
+        """
+        Convert an existing plain audit_logs table into a partitioned one.
+
+        Rows are copied into monthly partitions covering their range in one
+        transaction that holds an exclusive lock on the old table, so this
+        is run by the maintenance script, never at application startup.
+        No-op on other databases or when the table is already partitioned.
+
+        Returns:
+            True if the table was converted
+        """
+        if engine.dialect.name != "postgresql":
+            return False
+
+        with engine.begin() as conn:
+            if AuditPartitionService.is_partitioned(conn):
+                return False
+
+            conn.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+            oldest, newest = conn.execute(text(f"SELECT min(created_at), max(created_at) FROM {TABLE}")).first()
+            sequence = conn.execute(text(f"SELECT pg_get_serial_sequence('{TABLE}', 'id')")).scalar()
+
+            staging = f"{TABLE}_partitioned"
+            conn.execute(text(
+                f"CREATE TABLE {staging} (LIKE {TABLE} INCLUDING DEFAULTS) "
+                f"PARTITION BY RANGE (created_at)"
+            ))
+            conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {staging} DEFAULT"))
+
+            this_month = month_start(datetime.utcnow().date())
+            month = month_start(oldest.date()) if oldest else this_month
+            last = max(add_months(this_month, months_ahead), month_start(newest.date()) if newest else this_month)
+            while month <= last:
+                conn.execute(text(
+                    f"CREATE TABLE {partition_name(month)} PARTITION OF {staging} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                ))
+                month = add_months(month, 1)
+
+            conn.execute(text(f"INSERT INTO {staging} SELECT * FROM {TABLE}"))
+            if sequence:
+                # Keep the id sequence alive when the old table is dropped
+                conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+            conn.execute(text(f"DROP TABLE {TABLE}"))
+            conn.execute(text(f"ALTER TABLE {staging} RENAME TO {TABLE}"))
+            if sequence:
+                conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id"))
+
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, created_at)"))
+            conn.execute(text(
+                f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_booking_id_fkey "
+                f"FOREIGN KEY (booking_id) REFERENCES bookings (id)"
+            ))
+            conn.execute(text(
+                f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_actor_user_id_fkey "
+                f"FOREIGN KEY (actor_user_id) REFERENCES users (id)"
+            ))
+            for index in AuditLog.__table__.indexes:
+                index.create(bind=conn)
+
+        logger.info("Converted %s to a monthly partitioned table", TABLE)
+        return True
+
+    @staticmethod
+    def archive_partitions(conn: Connection, retain_months: int, archive_dir: Path, today: Optional[date] = None) -> List[Path]:
+        """
+        Detach partitions older than retain_months, export each one to
+        <archive_dir>/<partition>.csv.gz and drop it.
+
+        Each file is fully written and synced before its partition is
+        dropped; run inside a transaction so a failure leaves the partition
+        attached.
+
+        Returns:
+            Paths of the archive files written
+        """
+        cutoff = add_months(month_start(today or datetime.utcnow().date()), -retain_months)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+
+        written = []
+        for partition in AuditPartitionService.list_partitions(conn):
+            if partition.month >= cutoff:
+                continue
+            conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {partition.name}"))
+
+            path = archive_dir / f"{partition.name}.csv.gz"
+            partial = path.with_name(path.name + ".part")
+            cursor = conn.connection.cursor()
+            try:
+                with open(partial, "wb") as raw:
+                    with gzip.GzipFile(fileobj=raw, mode="wb") as compressed:
+                        with io.TextIOWrapper(compressed, encoding="utf-8", newline="") as archive:
+                            cursor.copy_expert(
+                                f"COPY {partition.name} TO STDOUT WITH (FORMAT csv, HEADER)", archive
+                            )
+                    raw.flush()
+                    os.fsync(raw.fileno())
+            finally:
+                cursor.close()
+            partial.replace(path)
+
+            conn.execute(text(f"DROP TABLE {partition.name}"))
+            logger.info("Archived %s to %s", partition.name, path)
+            written.append(path)
+        return written
@@ -2,11 +2,25 @@
 Booking operations service for status updates and actions.
 """
 from datetime import datetime
-from typing import Optional
+from types import SimpleNamespace
+from typing import Optional, List, Dict, Sequence
+from sqlalchemy import update, insert, select, delete
 from sqlalchemy.orm import Session
 
-from ...models import Booking, BookingStatus, AuditLog, AuditEventType, Vehicle
+from ...models import Booking, BookingStatus, AuditLog, AuditEventType, BookingTombstone, BookingNote
 from ...shemas import BookingUpdate
+from ..reports.revenue_rollup import RevenueRollupService
+from ..audit.audit_service import change_meta
+from ..audit.audit_writer import AuditWriter, audit_event
+from .booking_service import BookingService
+
+
+# Statuses a booking must have for each transition
+CHECK_IN_FROM = (BookingStatus.booked,)
+COLLECT_FROM = (BookingStatus.on_site, BookingStatus.overstay)
+
+# Compare-and-set retries for update_status under concurrent changes
+STATUS_UPDATE_ATTEMPTS = 3
 
 
 class BookingOperationsService:
@@ -24,29 +38,17 @@ class BookingOperationsService:
         Returns:
             Updated booking or None if not found
         """
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        if not booking:
-            return None
-        
-        # Only allow check-in for BOOKED status
-        if booking.status != BookingStatus.booked:
-            raise ValueError(f"Cannot check in booking with status {booking.status.value}")
-        
-        booking.status = BookingStatus.on_site
-        booking.checked_in_at = datetime.utcnow()
-        
-        # Create audit log
-        audit_log = AuditLog(
-            booking_id=booking_id,
-            actor_user_id=user_id,
+        return BookingOperationsService._single_transition(
+            db,
+            booking_id,
+            allowed=CHECK_IN_FROM,
+            new_status=BookingStatus.on_site,
+            timestamp_field="checked_in_at",
             event_type=AuditEventType.check_in,
             message="Vehicle checked in",
+            action="check in",
+            user_id=user_id,
         )
-        db.add(audit_log)
-        
-        db.commit()
-        db.refresh(booking)
-        return booking
 
     @staticmethod
     def collect(db: Session, booking_id: int, user_id: Optional[int] = None) -> Optional[Booking]:
@@ -61,30 +63,17 @@ class BookingOperationsService:
         Returns:
             Updated booking or None if not found
         """
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        if not booking:
-            return None
-        
-        # Only allow collection for ON_SITE or OVERSTAY status
-        if booking.status not in [BookingStatus.on_site, BookingStatus.overstay]:
-            raise ValueError(f"Cannot collect booking with status {booking.status.value}")
-        
-        booking.status = BookingStatus.collected
-        booking.collected_at = datetime.utcnow()
-        
-        # Create audit log
-        audit_log = AuditLog(
-            
-            booking_id=booking_id,
-            actor_user_id=user_id,
+        return BookingOperationsService._single_transition(
+            db,
+            booking_id,
+            allowed=COLLECT_FROM,
+            new_status=BookingStatus.collected,
+            timestamp_field="collected_at",
             event_type=AuditEventType.check_out,
             message="Vehicle collected by customer",
+            action="collect",
+            user_id=user_id,
         )
-        db.add(audit_log)
-        
-        db.commit()
-        db.refresh(booking)
-        return booking
 
     @staticmethod
     def update_status(
@@ -96,6 +85,9 @@ class BookingOperationsService:
         """
         Update booking status.
         
+        The change is a compare-and-set on the status read just before it, so
+        a concurrent change is retried instead of silently overwritten.
+        
         Args:
             db: Database session
             booking_id: ID of the booking
@@ -105,25 +97,48 @@ class BookingOperationsService:
         Returns:
             Updated booking or None if not found
         """
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        if not booking:
-            return None
-        
-        old_status = booking.status
-        booking.status = status
-        
-        # Create audit log
-        audit_log = AuditLog(
+        for _ in range(STATUS_UPDATE_ATTEMPTS):
+            current = db.execute(
+                select(
+                    Booking.status,
+                    Booking.created_at,
+                    Booking.flight_type,
+                    Booking.payment_method,
+                    Booking.cost,
+                ).where(Booking.id == booking_id)
+            ).first()
+            if current is None:
+                return None
+
+            old_status = BookingStatus(current.status)
+            now = datetime.utcnow()
+            moved = db.execute(
+                update(Booking)
+                .where(Booking.id == booking_id, Booking.status == old_status)
+                .values(status=status, updated_at=now)
+                .returning(Booking.id)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if moved is not None:
+                break
+            db.rollback()
+        else:
+            raise ValueError("Booking was modified concurrently, please retry")
+
+        revenue_before = RevenueRollupService.contribution(current)
+        revenue_after = RevenueRollupService.contribution(SimpleNamespace(**{**current._asdict(), "status": status}))
+        RevenueRollupService.record_change(db, revenue_before, revenue_after)
+
+        db.execute(insert(AuditLog).values(
             booking_id=booking_id,
             actor_user_id=user_id,
             event_type=AuditEventType.status_change,
             message=f"Status changed from {old_status.value} to {status.value}",
-        )
-        db.add(audit_log)
-        
+            meta_json=change_meta({"status": old_status}, {"status": status}),
+            created_at=now,
+        ))
         db.commit()
-        db.refresh(booking)
-        return booking
+        return BookingService.get_by_id(db, booking_id)
 
     @staticmethod
     def add_note(
@@ -144,22 +159,97 @@ class BookingOperationsService:
         Returns:
             Updated booking or None if not found
         """
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        if not booking:
+        now = datetime.utcnow()
+        updated = db.execute(
+            update(Booking)
+            .where(Booking.id == booking_id)
+            .values(
+                note_count=Booking.note_count + 1,
+                last_note=note,
+                last_note_at=now,
+                updated_at=now,
+            )
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if updated is None:
             return None
         
-        # Create audit log for note
+        booking_note = BookingNote(booking_id=booking_id, author_user_id=user_id, body=note, created_at=now)
+        db.add(booking_note)
+        db.flush()
+        
+        # Keep the note in the activity feed
         audit_log = AuditLog(
             booking_id=booking_id,
             actor_user_id=user_id,
             event_type=AuditEventType.note,
-            message=f"Note added: {note}",
+            message=f"Note added: {note}"[:255],
+            meta_json={"note_id": booking_note.id},
+            created_at=now,
         )
         db.add(audit_log)
         
         db.commit()
-        db.refresh(booking)
-        return booking
+        return BookingService.get_by_id(db, booking_id)
+
+    @staticmethod
+    def delete_note(
+        db: Session,
+        booking_id: int,
+        note_id: int,
+        user_id: Optional[int] = None,
+    ) -> bool:
+        """
+        Delete a note from a booking and refresh its note count and last note.
+        
+        Args:
+            db: Database session
+            booking_id: ID of the booking
+            note_id: ID of the note
+            user_id: ID of the user deleting the note (optional)
+        
+        Returns:
+            True if deleted, False if the note was not found on this booking
+        """
+        deleted = db.execute(
+            delete(BookingNote)
+            .where(BookingNote.id == note_id, BookingNote.booking_id == booking_id)
+            .returning(BookingNote.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if deleted is None:
+            return False
+        
+        latest = (
+            select(BookingNote)
+            .where(BookingNote.booking_id == booking_id)
+            .order_by(BookingNote.created_at.desc(), BookingNote.id.desc())
+            .limit(1)
+            .subquery()
+        )
+        now = datetime.utcnow()
+        db.execute(
+            update(Booking)
+            .where(Booking.id == booking_id)
+            .values(
+                note_count=Booking.note_count - 1,
+                last_note=select(latest.c.body).scalar_subquery(),
+                last_note_at=select(latest.c.created_at).scalar_subquery(),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.add(AuditLog(
+            booking_id=booking_id,
+            actor_user_id=user_id,
+            event_type=AuditEventType.note,
+            message="Note deleted",
+            meta_json={"note_id": note_id, "action": "deleted"},
+            created_at=now,
+        ))
+        db.commit()
+        return True
 
     @staticmethod
     def update_booking(db: Session, booking_id: int, new_booking: BookingUpdate) -> Optional[Booking]:
@@ -180,8 +270,21 @@ class BookingOperationsService:
         if not booking:
             return None
         
-        for key, value in new_booking.model_dump(exclude_unset=True).items():
+        changes = new_booking.model_dump(exclude_unset=True)
+        before = {key: getattr(booking, key) for key in changes}
+        revenue_before = RevenueRollupService.contribution(booking)
+        for key, value in changes.items():
             setattr(booking, key, value)
+        RevenueRollupService.record_change(db, revenue_before, RevenueRollupService.contribution(booking))
+        
+        meta = change_meta(before, changes)
+        if meta:
+            db.add(AuditLog(
+                booking_id=booking_id,
+                event_type=AuditEventType.updated,
+                message=f"Booking updated: {', '.join(meta['fields'])}",
+                meta_json=meta,
+            ))
         db.commit()
         db.refresh(booking)
         return booking
@@ -191,17 +294,181 @@ class BookingOperationsService:
         """
         Delete a booking and associated records.
         
+        A tombstone is recorded so clients syncing deltas learn about the removal.
+        
         Args:
             db: Database session
             booking_id: ID of the booking to delete
+        
+        Returns:
+            Deleted booking or None if not found
         """
         booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        booking = db.delete(db.query(Vehicle).filter(Vehicle.id == booking.vehicle_id).first())
-        booking = db.delete(db.query(AuditLog).filter(AuditLog.booking_id == booking_id).all())
-        
         if not booking:
             return None
+        
+        RevenueRollupService.record_change(db, RevenueRollupService.contribution(booking), None)
+        
+        # Audit logs are removed through the relationship cascade
         db.delete(booking)
+        db.add(BookingTombstone(booking_id=booking_id))
         db.commit()
-        db.refresh(booking)
-        return booking
\ No newline at end of file
+        return booking
+
+    @staticmethod
+    def bulk_check_in(
+        db: Session, booking_ids: Sequence[int], user_id: Optional[int] = None
+    ) -> Dict[int, Optional[str]]:
+        """
+        Check in many bookings (BOOKED -> ON_SITE) in one transaction.
+        
+        Returns:
+            Mapping of booking ID to None on success or an error message
+        """
+        return BookingOperationsService._bulk_transition(
+            db,
+            booking_ids,
+            allowed=CHECK_IN_FROM,
+            new_status=BookingStatus.on_site,
+            timestamp_field="checked_in_at",
+            event_type=AuditEventType.check_in,
+            message="Vehicle checked in",
+            action="check in",
+            user_id=user_id,
+        )
+
+    @staticmethod
+    def bulk_collect(
+        db: Session, booking_ids: Sequence[int], user_id: Optional[int] = None
+    ) -> Dict[int, Optional[str]]:
+        """
+        Collect many bookings (ON_SITE/OVERSTAY -> COLLECTED) in one transaction.
+        
+        Returns:
+            Mapping of booking ID to None on success or an error message
+        """
+        return BookingOperationsService._bulk_transition(
+            db,
+            booking_ids,
+            allowed=COLLECT_FROM,
+            new_status=BookingStatus.collected,
+            timestamp_field="collected_at",
+            event_type=AuditEventType.check_out,
+            message="Vehicle collected by customer",
+            action="collect",
+            user_id=user_id,
+        )
+
+    @staticmethod
+    def _single_transition(
+        db: Session,
+        booking_id: int,
+        allowed: Sequence[BookingStatus],
+        new_status: BookingStatus,
+        timestamp_field: str,
+        event_type: AuditEventType,
+        message: str,
+        action: str,
+        user_id: Optional[int] = None,
+    ) -> Optional[Booking]:
+        """
+        Transition one booking and return it with its relations eager-loaded.
+        
+        Raises:
+            ValueError: If the booking's status does not allow the transition
+        """
+        updated_ids = BookingOperationsService._transition(
+            db, [booking_id], allowed, new_status, timestamp_field, event_type, message, user_id
+        )
+        if not updated_ids:
+            status = BookingOperationsService._current_statuses(db, [booking_id]).get(booking_id)
+            if status is None:
+                return None
+            raise ValueError(f"Cannot {action} booking with status {status.value}")
+        return BookingService.get_by_id(db, booking_id)
+
+    @staticmethod
+    def _bulk_transition(
+        db: Session,
+        booking_ids: Sequence[int],
+        allowed: Sequence[BookingStatus],
+        new_status: BookingStatus,
+        timestamp_field: str,
+        event_type: AuditEventType,
+        message: str,
+        action: str,
+        user_id: Optional[int] = None,
+    ) -> Dict[int, Optional[str]]:
+        """
+        Transition many bookings; bookings that were not updated are looked
+        up once to explain why.
+        """
+        requested = list(dict.fromkeys(booking_ids))
+        updated_ids = BookingOperationsService._transition(
+            db, requested, allowed, new_status, timestamp_field, event_type, message, user_id,
+            batched_audit=True,
+        )
+
+        results: Dict[int, Optional[str]] = {booking_id: None for booking_id in updated_ids}
+        skipped = [booking_id for booking_id in requested if booking_id not in results]
+        if skipped:
+            current = BookingOperationsService._current_statuses(db, skipped)
+            for booking_id in skipped:
+                status = current.get(booking_id)
+                results[booking_id] = (
+                    "Booking not found" if status is None
+                    else f"Cannot {action} booking with status {status.value}"
+                )
+
+        return {booking_id: results[booking_id] for booking_id in requested}
+
+    @staticmethod
+    def _transition(
+        db: Session,
+        booking_ids: Sequence[int],
+        allowed: Sequence[BookingStatus],
+        new_status: BookingStatus,
+        timestamp_field: str,
+        event_type: AuditEventType,
+        message: str,
+        user_id: Optional[int] = None,
+        batched_audit: bool = False,
+    ) -> List[int]:
+        """
+        Race-free status transition: one conditional UPDATE ... RETURNING
+        moves only bookings still in an allowed status, then one multi-row
+        audit insert and one commit.
+        
+        With batched_audit the audit rows go through the AuditWriter instead,
+        which writes them after the commit. Single-booking actions keep them
+        inline so the returned activity includes them.
+        
+        Returns:
+            IDs of the bookings that were updated
+        """
+        now = datetime.utcnow()
+        updated_ids = db.execute(
+            update(Booking)
+            .where(Booking.id.in_(booking_ids), Booking.status.in_(allowed))
+            .values({"status": new_status, timestamp_field: now, "updated_at": now})
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        if updated_ids:
+            events = [
+                audit_event(booking_id, event_type, message, actor_user_id=user_id, created_at=now)
+                for booking_id in updated_ids
+            ]
+            if batched_audit:
+                AuditWriter.record(db, events)
+            else:
+                db.execute(insert(AuditLog), events)
+            db.commit()
+        return updated_ids
+
+    @staticmethod
+    def _current_statuses(db: Session, booking_ids: Sequence[int]) -> Dict[int, BookingStatus]:
+        """Current status of each existing booking among booking_ids."""
+        rows = db.execute(select(Booking.id, Booking.status).where(Booking.id.in_(booking_ids))).all()
+        return {booking_id: BookingStatus(status) for booking_id, status in rows}
@@ -2,11 +2,23 @@
 Booking service for querying and retrieving bookings.
 """
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterator
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, tuple_, func, case, select, Row
 
-from ...models import Booking, BookingStatus, FlightType, PaymentMethod, AuditLog
+from ...models import (
+    Booking,
+    BookingStatus,
+    FlightType,
+    PaymentMethod,
+    AuditLog,
+    BookingTombstone,
+    BookingNote,
+    Customer,
+    Vehicle,
+)
+from .pagination import decode_cursor
+from .search import search_filter, search_rank
 
 
 class BookingService:
@@ -21,6 +33,8 @@ class BookingService:
         search: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
+        ranked: bool = False,
     ) -> List[Booking]:
         """
         Get all bookings with optional filters.
@@ -33,9 +47,82 @@ class BookingService:
             search: Search in customer name, email, phone, or vehicle registration
             skip: Number of records to skip
             limit: Maximum number of records to return
+            cursor: Keyset cursor from a previous page; when set, only bookings
+                ordered after the cursor position are returned
+            ranked: Order search results by relevance before recency (not
+                compatible with cursor pagination)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = BookingService._build_list_query(
+            db, status, payment_method, flight_type, search, cursor, ranked
+        )
+        return query.offset(skip).limit(limit).all()
+
+    @staticmethod
+    def iter_all(
+        db: Session,
+        status: Optional[BookingStatus] = None,
+        payment_method: Optional[PaymentMethod] = None,
+        flight_type: Optional[FlightType] = None,
+        search: Optional[str] = None,
+        chunk_size: int = 500,
+        ranked: bool = False,
+    ) -> Iterator[Booking]:
+        """
+        Iterate over all bookings matching the filters, loading them from the
+        database in chunks of chunk_size rows instead of all at once.
+
+        Takes the same filters as get_all.
+        """
+        query = BookingService._build_list_query(
+            db, status, payment_method, flight_type, search, ranked=ranked
+        )
+        yield from query.yield_per(chunk_size)
+
+    @staticmethod
+    def _build_list_query(
+        db: Session,
+        status: Optional[BookingStatus] = None,
+        payment_method: Optional[PaymentMethod] = None,
+        flight_type: Optional[FlightType] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        ranked: bool = False,
+    ):
+        """Build the filtered, ordered and eager-loaded query shared by list methods."""
+        query = BookingService._apply_list_filters(
+            db.query(Booking), db, status, payment_method, flight_type, search, cursor, ranked
+        )
+
+        # Eager load relationships to avoid N+1 queries
+        query = query.options(
+            joinedload(Booking.customer),
+            joinedload(Booking.vehicle),
+            selectinload(Booking.audit_logs).joinedload(AuditLog.actor),
+            selectinload(Booking.notes),
+        )
+
+        return query
+
+    @staticmethod
+    def _apply_list_filters(
+        query,
+        db: Session,
+        status: Optional[BookingStatus] = None,
+        payment_method: Optional[PaymentMethod] = None,
+        flight_type: Optional[FlightType] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        ranked: bool = False,
+        joined: bool = False,
+    ):
+        """
+        Apply list filters, search, keyset cursor and ordering to an ORM query
+        or a Core select(). Set joined when customers and vehicles are already
+        joined into the statement.
         """
-        query = db.query(Booking)
-        
         # Apply filters
         if status:
             query = query.filter(Booking.status == status)
@@ -46,30 +133,76 @@ class BookingService:
         if flight_type:
             query = query.filter(Booking.flight_type == flight_type)
         
-        # Search filter
+        # Search filter (trigram-indexed on PostgreSQL)
         if search:
-            from ...models import Customer, Vehicle
-            search_term = f"%{search.lower()}%"
-            query = query.join(Customer).join(Vehicle).filter(
-                or_(
-                    Customer.full_name.ilike(search_term),
-                    Customer.email.ilike(search_term),
-                    Customer.whatsapp_number.ilike(search_term),
-                    Vehicle.registration.ilike(search_term),
-                )
-            )
+            if not joined:
+                query = query.join(Customer).join(Vehicle)
+            query = query.filter(search_filter(search))
+            if ranked and not cursor:
+                query = query.order_by(search_rank(search, db.get_bind().dialect.name).desc())
         
-        # Order by most recent first
-        query = query.order_by(Booking.created_at.desc())
+        # Keyset pagination: continue after the last (created_at, id) seen
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Booking.created_at, Booking.id) < tuple_(cursor_created_at, cursor_id)
+            )
 
-        # Eager load relationships to avoid N+1 queries
-        query = query.options(
-            joinedload(Booking.customer),
-            joinedload(Booking.vehicle),
-            selectinload(Booking.audit_logs).joinedload(AuditLog.actor),
-        )
+        # Order by most recent first (id breaks ties so the order is stable)
+        return query.order_by(Booking.created_at.desc(), Booking.id.desc())
 
-        return query.offset(skip).limit(limit).all()
+    @staticmethod
+    def get_summaries(
+        db: Session,
+        status: Optional[BookingStatus] = None,
+        payment_method: Optional[PaymentMethod] = None,
+        flight_type: Optional[FlightType] = None,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        ranked: bool = False,
+    ) -> List[Row]:
+        """
+        Get a lightweight projection of bookings for list views.
+
+        Selects only booking, customer and vehicle columns into plain rows: no
+        ORM objects are built and audit logs are not loaded. Takes the same
+        arguments as get_all.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        stmt = (
+            select(
+                Booking.id,
+                Booking.customer_id,
+                Booking.created_at,
+                Booking.flight_type,
+                Booking.dropoff_at,
+                Booking.pickup_at,
+                Booking.payment_method,
+                Booking.special_instructions,
+                Booking.cost,
+                Booking.status,
+                Booking.checked_in_at,
+                Booking.collected_at,
+                Booking.note_count,
+                Booking.last_note,
+                Customer.full_name,
+                Customer.email,
+                Customer.whatsapp_number,
+                Vehicle.registration,
+                Vehicle.make_model,
+                Vehicle.color,
+            )
+            .join(Customer, Booking.customer_id == Customer.id)
+            .join(Vehicle, Booking.vehicle_id == Vehicle.id)
+        )
+        stmt = BookingService._apply_list_filters(
+            stmt, db, status, payment_method, flight_type, search, cursor, ranked, joined=True
+        )
+        return db.execute(stmt.offset(skip).limit(limit)).all()
 
     @staticmethod
     def get_by_id(db: Session, booking_id: int) -> Optional[Booking]:
@@ -81,10 +214,106 @@ class BookingService:
                 joinedload(Booking.customer),
                 joinedload(Booking.vehicle),
                 selectinload(Booking.audit_logs).joinedload(AuditLog.actor),
+                selectinload(Booking.notes),
             )
             .first()
         )
 
+    @staticmethod
+    def get_notes(db: Session, booking_id: int) -> List[BookingNote]:
+        """Get a booking's notes, oldest first, with their authors."""
+        return (
+            db.query(BookingNote)
+            .filter(BookingNote.booking_id == booking_id)
+            .options(joinedload(BookingNote.author))
+            .order_by(BookingNote.created_at.asc(), BookingNote.id.asc())
+            .all()
+        )
+
+    @staticmethod
+    def get_changed_since(db: Session, since: datetime) -> List[Booking]:
+        """
+        Get bookings modified after a watermark.
+
+        A booking counts as changed when its own row was updated or when a new
+        audit log entry (check-in, note, status change, ...) was written for it.
+
+        Args:
+            db: Database session
+            since: Watermark as naive UTC (exclusive)
+        """
+        recent_activity = (
+            db.query(AuditLog.booking_id)
+            .filter(AuditLog.created_at > since)
+        )
+        return (
+            db.query(Booking)
+            .filter(
+                or_(
+                    Booking.updated_at > since,
+                    Booking.id.in_(recent_activity),
+                )
+            )
+            .order_by(Booking.updated_at.asc(), Booking.id.asc())
+            .options(
+                joinedload(Booking.customer),
+                joinedload(Booking.vehicle),
+                selectinload(Booking.audit_logs).joinedload(AuditLog.actor),
+                selectinload(Booking.notes),
+            )
+            .all()
+        )
+
+    @staticmethod
+    def get_deleted_since(db: Session, since: datetime) -> List[int]:
+        """Get IDs of bookings deleted after a watermark (naive UTC, exclusive)."""
+        rows = (
+            db.query(BookingTombstone.booking_id)
+            .filter(BookingTombstone.deleted_at > since)
+            .order_by(BookingTombstone.deleted_at.asc())
+            .all()
+        )
+        return [row.booking_id for row in rows]
+
+    @staticmethod
+    def get_data_version(db: Session) -> str:
+        """
+        Cheap fingerprint of the bookings data, changing whenever a booking is
+        created, updated or deleted, an audit log entry is written, or a
+        customer or vehicle embedded in booking payloads is edited.
+        """
+        row = db.query(
+            select(func.count(Booking.id)).scalar_subquery(),
+            select(func.max(Booking.updated_at)).scalar_subquery(),
+            select(func.max(AuditLog.id)).scalar_subquery(),
+            select(func.max(BookingTombstone.id)).scalar_subquery(),
+            select(func.max(Customer.updated_at)).scalar_subquery(),
+            select(func.max(Vehicle.updated_at)).scalar_subquery(),
+        ).one()
+        return ":".join("" if value is None else str(value) for value in row)
+
+    @staticmethod
+    def get_booking_version(db: Session, booking_id: int) -> Optional[str]:
+        """
+        Fingerprint of a single booking, its audit trail and its customer and
+        vehicle, or None if not found.
+        """
+        latest_log = (
+            select(func.max(AuditLog.id))
+            .where(AuditLog.booking_id == booking_id)
+            .scalar_subquery()
+        )
+        row = (
+            db.query(Booking.updated_at, latest_log, Customer.updated_at, Vehicle.updated_at)
+            .join(Customer, Booking.customer_id == Customer.id)
+            .join(Vehicle, Booking.vehicle_id == Vehicle.id)
+            .filter(Booking.id == booking_id)
+            .first()
+        )
+        if row is None:
+            return None
+        return ":".join("" if value is None else str(value) for value in row)
+
     @staticmethod
     def get_by_customer(db: Session, customer_id: int) -> List[Booking]:
         """Get all bookings for a specific customer."""
@@ -115,3 +344,40 @@ class BookingService:
             .all()
         )
 
+    @staticmethod
+    def get_dashboard_stats(
+        db: Session,
+        local_start: datetime,
+        local_end: datetime,
+        utc_start: datetime,
+        utc_end: datetime,
+    ) -> Dict[str, int]:
+        """
+        Compute dashboard KPI counts in a single aggregate query.
+
+        dropoff_at and pickup_at hold local wall-clock times, so drop-offs and
+        pickups today use the local bounds; created_at is stamped in UTC, so
+        bookings created today use the UTC bounds of the same local day.
+
+        Args:
+            db: Database session
+            local_start: Start of "today" as naive local time (inclusive)
+            local_end: End of "today" as naive local time (exclusive)
+            utc_start: Start of "today" as naive UTC (inclusive)
+            utc_end: End of "today" as naive UTC (exclusive)
+        """
+        def count_where(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        def between(column, start, end):
+            return and_(column >= start, column < end)
+
+        row = db.query(
+            count_where(Booking.status.in_([BookingStatus.on_site, BookingStatus.overstay])).label("cars_on_site"),
+            count_where(between(Booking.dropoff_at, local_start, local_end)).label("arrivals_today"),
+            count_where(between(Booking.pickup_at, local_start, local_end)).label("pickups_today"),
+            count_where(Booking.status == BookingStatus.overstay).label("overstays"),
+            count_where(between(Booking.created_at, utc_start, utc_end)).label("booked_today"),
+        ).one()
+
+        return {key: int(value) for key, value in row._mapping.items()}
@@ -0,0 +1,155 @@
+"""
+Overstay detector: moves ON_SITE bookings past their pickup time to OVERSTAY.
+
+Every server process starts the sweep thread, but on PostgreSQL only the
+process holding a session-level advisory lock runs sweeps; the others try
+to take the lock each interval, so one of them carries on if the sweeping
+process exits.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, List
+
+from sqlalchemy import text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...db import SessionLocal, engine
+from ...models import Booking, BookingStatus, AuditEventType
+from ..audit.audit_writer import AuditWriter, audit_event
+from .timezones import utc_to_local
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock held by the process that runs sweeps (PostgreSQL)
+SWEEP_LOCK_KEY = "overstay_sweeps"
+
+_stop_event = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+class OverstayDetector:
+
+    @staticmethod
+    def mark_overstays(db: Session, now: Optional[datetime] = None) -> List[int]:
+        """
+        Flag every overdue ON_SITE booking as OVERSTAY.
+        
+        Uses one set-based UPDATE ... RETURNING id (served by the partial index
+        on pickup_at WHERE status = ON_SITE) and inserts the audit logs in
+        the same transaction, then commits. pickup_at is local wall-clock time,
+        so it is compared with now converted to settings.TIMEZONE; updated_at
+        and the audit entries are stamped with now in UTC.
+        
+        Args:
+            db: Database session
+            now: Current time as naive UTC (defaults to the current time)
+        
+        Returns:
+            IDs of the bookings that were flagged
+        """
+        now = now or datetime.utcnow()
+        local_cutoff = utc_to_local(now)
+        booking_ids = db.execute(
+            update(Booking)
+            .where(Booking.status == BookingStatus.on_site, Booking.pickup_at < local_cutoff)
+            .values(status=BookingStatus.overstay, updated_at=now)
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        if booking_ids:
+            message = f"Status changed from {BookingStatus.on_site.value} to {BookingStatus.overstay.value}"
+            AuditWriter.record(db, (
+                audit_event(booking_id, AuditEventType.status_change, message, created_at=now)
+                for booking_id in booking_ids
+            ), synchronous=True)
+        db.commit()
+        return booking_ids
+
+
+def _acquire_sweep_lock() -> Optional[Connection]:
+    """
+    Try to take the sweep lock on a dedicated autocommit connection, which
+    keeps it until the connection is closed.
+
+    Returns:
+        The connection holding the lock, or None if another process holds it
+    """
+    conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        acquired = conn.execute(
+            text("SELECT pg_try_advisory_lock(hashtext(:key))"), {"key": SWEEP_LOCK_KEY}
+        ).scalar()
+    except Exception:
+        conn.close()
+        raise
+    if not acquired:
+        conn.close()
+        return None
+    logger.info("Running overstay sweeps in this process")
+    return conn
+
+
+def _sweep() -> None:
+    """Run one sweep in its own session."""
+    db = SessionLocal()
+    try:
+        booking_ids = OverstayDetector.mark_overstays(db)
+        if booking_ids:
+            logger.info("Marked %d booking(s) as overstay: %s", len(booking_ids), booking_ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _run_sweeps(interval_seconds: int) -> None:
+    """Sweep loop run by the background thread until stopped."""
+    locking = engine.dialect.name == "postgresql"
+    lock_conn: Optional[Connection] = None
+    try:
+        while not _stop_event.is_set():
+            try:
+                if locking:
+                    if lock_conn is None:
+                        lock_conn = _acquire_sweep_lock()
+                    else:
+                        # Fails if the connection, and with it the lock, was lost
+                        lock_conn.execute(text("SELECT 1"))
+                if lock_conn is not None or not locking:
+                    _sweep()
+            except Exception:
+                logger.exception("Overstay sweep failed")
+                if lock_conn is not None:
+                    lock_conn.close()
+                    lock_conn = None
+            _stop_event.wait(interval_seconds)
+    finally:
+        if lock_conn is not None:
+            lock_conn.close()
+
+
+def start_overstay_sweeps(interval_seconds: Optional[int] = None) -> None:
+    """Start the background sweep thread (no-op if already running)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop_event.clear()
+    _thread = threading.Thread(
+        target=_run_sweeps,
+        args=(interval_seconds or settings.OVERSTAY_SWEEP_SECONDS,),
+        name="overstay-sweeps",
+        daemon=True,
+    )
+    _thread.start()
+
+
+def stop_overstay_sweeps() -> None:
+    """Signal the sweep thread to stop and wait briefly for it."""
+    _stop_event.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
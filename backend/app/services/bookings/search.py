@@ -0,0 +1,52 @@
+"""
+Booking search predicates and relevance ranking.
+
+On PostgreSQL the searched columns carry pg_trgm GIN indexes (see models), so
+the ILIKE predicates below are served by index scans and results are ranked by
+trigram similarity on the same columns (pg_trgm folds case itself). Other
+databases (e.g. SQLite) fall back to plain ILIKE matching ranked by
+exact/prefix/substring matches.
+"""
+from sqlalchemy import or_, case, func
+
+from ...models import Customer, Vehicle
+
+SEARCH_COLUMNS = (
+    Customer.full_name,
+    Customer.email,
+    Customer.whatsapp_number,
+    Vehicle.registration,
+)
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_filter(term: str):
+    """Predicate matching bookings whose customer or vehicle contains the term."""
+    pattern = f"%{escape_like(term.lower())}%"
+    return or_(*(column.ilike(pattern, escape="\\") for column in SEARCH_COLUMNS))
+
+
+def search_rank(term: str, dialect_name: str):
+    """Relevance score for the term, higher is better."""
+    term = term.lower()
+    if dialect_name == "postgresql":
+        return func.greatest(*(func.similarity(column, term) for column in SEARCH_COLUMNS))
+
+    escaped = escape_like(term)
+    scores = []
+    for column in SEARCH_COLUMNS:
+        value = func.lower(column)
+        scores.append(
+            case(
+                (value == term, 3),
+                (value.like(f"{escaped}%", escape="\\"), 2),
+                (value.like(f"%{escaped}%", escape="\\"), 1),
+                else_=0,
+            )
+        )
+    # Sum of per-column scores: stronger and more numerous matches rank first
+    return sum(scores[1:], scores[0])
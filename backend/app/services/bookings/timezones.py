@@ -0,0 +1,73 @@
+"""
+Helpers for mapping local calendar days onto the naive datetimes stored in the database.
+
+Bookings mix two clocks: dropoff_at and pickup_at are local wall-clock times
+(as entered on the form or CSV), while created_at, updated_at, checked_in_at
+and collected_at are stamped with datetime.utcnow().
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ...config import settings
+
+
+def get_zone(tz_name: Optional[str] = None) -> ZoneInfo:
+    """
+    Resolve an IANA timezone name, defaulting to the configured TIMEZONE.
+
+    Raises:
+        ValueError: If the timezone is unknown
+    """
+    name = tz_name or settings.TIMEZONE
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Invalid timezone: {name}") from e
+
+
+def local_today(tz_name: Optional[str] = None) -> date:
+    """Current calendar date in the given timezone."""
+    return datetime.now(get_zone(tz_name)).date()
+
+
+def local_now(tz_name: Optional[str] = None) -> datetime:
+    """Current local wall-clock time as a naive datetime, comparable with dropoff_at/pickup_at."""
+    return datetime.now(get_zone(tz_name)).replace(tzinfo=None)
+
+
+def local_day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """Return the [start, end) of a calendar day as naive local wall-clock datetimes."""
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def local_day_bounds_utc(day: date, tz_name: Optional[str] = None) -> Tuple[datetime, datetime]:
+    """
+    Return the [start, end) of a local calendar day as naive UTC datetimes,
+    matching how timestamps are stored on bookings.
+    """
+    zone = get_zone(tz_name)
+    start = datetime.combine(day, time.min, tzinfo=zone)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=zone)
+    return (
+        start.astimezone(timezone.utc).replace(tzinfo=None),
+        end.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC; naive values are assumed to be UTC already."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def utc_to_local(value: datetime, tz_name: Optional[str] = None) -> datetime:
+    """Convert a naive UTC datetime to naive local wall-clock time."""
+    return value.replace(tzinfo=timezone.utc).astimezone(get_zone(tz_name)).replace(tzinfo=None)
+
+
+def local_date(value: datetime, tz_name: Optional[str] = None) -> date:
+    """Local calendar date of a naive UTC datetime."""
+    return value.replace(tzinfo=timezone.utc).astimezone(get_zone(tz_name)).date()
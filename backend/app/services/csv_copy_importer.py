@@ -0,0 +1,383 @@
+"""
+COPY-based CSV import engine for very large files (PostgreSQL).
+
+Rows from the parse stage of CSVImporter (see parse_rows) are streamed into
+a temporary staging table with COPY FROM STDIN. Deduplication and inserts
+then run as a handful of set-based statements over the staging table, so
+the number of round trips does not depend on the number of rows:
+
+1. Rows whose (source, source_row_id) already exists are reported as
+   duplicates and removed from staging.
+2. Customers are resolved like the row-by-row and bulk paths do, in file
+   order: by email (existing customers, then new ones created by earlier
+   rows), then by phone (likewise). Because a row's outcome depends on
+   earlier rows, the rows left after matching existing emails are settled
+   in a few rounds of UPDATEs, each deciding every row whose earlier rows
+   sharing its email or phone are already decided. New customers get IDs
+   from the customers sequence and are inserted in one INSERT ... SELECT.
+3. Vehicles are inserted with INSERT ... SELECT ... ON CONFLICT
+   (registration) DO NOTHING and resolved by registration.
+4. Bookings are inserted with INSERT ... SELECT ... ON CONFLICT ON
+   CONSTRAINT uq_booking_source_row DO NOTHING; rows that lose a race with
+   a concurrent import are reported as duplicates.
+5. The revenue rollup and CREATED audit entries are written from staging.
+
+Failed rows are counted in full, but only the first CSV_IMPORT_MAX_ERRORS
+of each kind are read back for the error report.
+
+On other databases CSVCopyImporter falls back to the multi-row insert path
+of CSVImporter.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Iterable, Iterator, List
+
+from sqlalchemy import text
+
+from ..config import settings
+from ..models import FlightType, PaymentMethod
+from .csv_importer import CSVImporter, ParseResult
+from .reports.revenue_rollup import RevenueRollupService
+
+STAGING_TABLE = "csv_import_staging"
+
+STAGING_COLUMNS = (
+    "row_number",
+    "source_row_id",
+    "full_name",
+    "email",
+    "whatsapp",
+    "registration",
+    "make_model",
+    "color",
+    "flight_type",
+    "dropoff_at",
+    "pickup_at",
+    "payment_method",
+    "special_instructions",
+    "cost",
+    "created_at",
+    "raw",
+)
+
+DUPLICATE_ERROR = "Booking already exists (duplicate row)"
+
+
+class _LineStream(io.RawIOBase):
+    """Read-only file object over an iterator of text lines, for COPY FROM STDIN."""
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._pending) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._pending += line.encode("utf-8")
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+class CSVCopyImporter(CSVImporter):
+    """CSVImporter whose bulk mode loads through a COPY staging table on PostgreSQL."""
+
+    def bulk_chunk_size(self) -> Optional[int]:
+        """COPY streams the whole input through one staging table."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return None
+        return super().bulk_chunk_size()
+
+    def import_parsed_bulk(self, results: Iterable[ParseResult], source: str = "csv") -> None:
+        """
+        Set-based import of parsed rows through a staging table, updating
+        self.stats. Runs inside the caller's transaction.
+        """
+        if self.db.get_bind().dialect.name != "postgresql":
+            super().import_parsed_bulk(results, source)
+            return
+
+        errors: List[tuple] = []
+        self._create_staging_table()
+        failed = self._copy_rows(results, errors)
+        self.db.execute(text(f"ANALYZE {STAGING_TABLE}"))
+
+        duplicate = (
+            f"FROM {STAGING_TABLE} s JOIN bookings b "
+            f"ON b.source = :source AND b.source_row_id = s.source_row_id"
+        )
+        failed += self._collect_duplicates(duplicate, {"source": source}, errors)
+        self.db.execute(
+            text(
+                f"DELETE FROM {STAGING_TABLE} s USING bookings b "
+                f"WHERE b.source = :source AND b.source_row_id = s.source_row_id"
+            ),
+            {"source": source},
+        )
+
+        now = datetime.utcnow()
+        self._resolve_customers(now)
+        self._resolve_vehicles(now)
+        self._insert_bookings(source, now)
+
+        failed += self._collect_duplicates(f"FROM {STAGING_TABLE} s WHERE s.booking_id IS NULL", {}, errors)
+
+        self._apply_revenue()
+        self.db.execute(
+            text(
+                f"INSERT INTO audit_logs (booking_id, event_type, message, created_at) "
+                f"SELECT booking_id, 'created'::auditeventtype, :message, :now "
+                f"FROM {STAGING_TABLE} WHERE booking_id IS NOT NULL"
+            ),
+            {"message": f"Booking imported from {source}", "now": now},
+        )
+
+        imported = self.db.execute(
+            text(f"SELECT count(*) FROM {STAGING_TABLE} WHERE booking_id IS NOT NULL")
+        ).scalar()
+        self.db.execute(text(f"DROP TABLE {STAGING_TABLE}"))
+
+        self.stats["successful"] += imported
+        self.stats["failed"] += failed
+        for row_number, error, data in sorted(errors, key=lambda item: item[0]):
+            self.add_error(row_number, error, data)
+
+    def _collect_duplicates(self, source_sql: str, params: dict, errors: List[tuple]) -> int:
+        """
+        Count the staged rows selected by source_sql (a FROM clause over
+        staging aliased s) and add the first CSV_IMPORT_MAX_ERRORS of them
+        to errors as duplicates.
+
+        Returns:
+            Number of rows selected
+        """
+        count = self.db.execute(text(f"SELECT count(*) {source_sql}"), params).scalar()
+        if count:
+            first = self.db.execute(
+                text(f"SELECT s.row_number, s.raw {source_sql} ORDER BY s.row_number LIMIT :limit"),
+                {**params, "limit": settings.CSV_IMPORT_MAX_ERRORS},
+            ).all()
+            errors.extend((row_number, DUPLICATE_ERROR, json.loads(raw)) for row_number, raw in first)
+        return count
+
+    def _create_staging_table(self) -> None:
+        """Create the session-local staging table (dropped at commit)."""
+        self.db.execute(text(f"DROP TABLE IF EXISTS {STAGING_TABLE}"))
+        self.db.execute(text(
+            f"CREATE TEMPORARY TABLE {STAGING_TABLE} ("
+            "row_number INTEGER PRIMARY KEY, "
+            "source_row_id TEXT NOT NULL, "
+            "full_name TEXT NOT NULL, "
+            "email TEXT, "
+            "whatsapp TEXT, "
+            "registration TEXT NOT NULL, "
+            "make_model TEXT NOT NULL, "
+            "color TEXT, "
+            "flight_type TEXT NOT NULL, "
+            "dropoff_at TIMESTAMP NOT NULL, "
+            "pickup_at TIMESTAMP NOT NULL, "
+            "payment_method TEXT NOT NULL, "
+            "special_instructions TEXT, "
+            "cost NUMERIC(10, 2) NOT NULL, "
+            "created_at TIMESTAMP NOT NULL, "
+            "raw TEXT NOT NULL, "
+            "customer_id INTEGER, "
+            "creates_customer BOOLEAN NOT NULL DEFAULT FALSE, "
+            "phone_customer_id INTEGER, "
+            "vehicle_id INTEGER, "
+            "booking_id INTEGER"
+            ") ON COMMIT DROP"
+        ))
+
+    def _copy_rows(self, results: Iterable[ParseResult], errors: List[tuple]) -> int:
+        """
+        Stream the valid parsed rows into staging with COPY. The first
+        CSV_IMPORT_MAX_ERRORS rows that fail to parse are added to errors.
+
+        Returns:
+            Number of rows that failed to parse
+        """
+        failed = 0
+
+        def lines() -> Iterator[str]:
+            nonlocal failed
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            for row_number, row, parsed, error in results:
+                self.stats["total_rows"] += 1
+                if error:
+                    failed += 1
+                    if failed <= settings.CSV_IMPORT_MAX_ERRORS:
+                        errors.append((row_number, error, {k: v for k, v in row.items() if k}))
+                    continue
+                if not parsed:
+                    self.stats["skipped"] += 1
+                    continue
+                writer.writerow([
+                    row_number,
+                    parsed.source_row_id,
+                    parsed.full_name,
+                    parsed.email,
+                    parsed.whatsapp,
+                    parsed.registration,
+                    parsed.make_model,
+                    parsed.color,
+                    parsed.flight_type.name,
+                    parsed.dropoff_at.isoformat(),
+                    parsed.pickup_at.isoformat(),
+                    parsed.payment_method.name,
+                    parsed.special_instructions,
+                    parsed.cost,
+                    parsed.created_at.isoformat(),
+                    json.dumps({k: v for k, v in row.items() if k}),
+                ])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                _LineStream(lines()),
+            )
+        finally:
+            cursor.close()
+
+        for column in ("source_row_id", "email", "whatsapp", "registration"):
+            self.db.execute(text(f"CREATE INDEX ON {STAGING_TABLE} ({column})"))
+        return failed
+
+    def _resolve_customers(self, now: datetime) -> None:
+        """
+        Match staged rows to customers and insert the new ones.
+
+        Mirrors the bulk path, which walks rows in order: a row takes the
+        customer with its email (existing, or created by an earlier row),
+        else the customer with its phone (existing, or the first created by
+        an earlier row), else creates one. Existing emails are matched up
+        front; the other rows are decided in rounds, each settling the rows
+        whose earlier rows sharing their email or phone are all decided.
+        The earliest undecided row always qualifies, so every round makes
+        progress; ordinary files need two or three.
+        """
+        # Existing customers by email (lowest id wins, like .first())
+        self.db.execute(text(
+            f"UPDATE {STAGING_TABLE} s SET customer_id = c.id "
+            f"FROM (SELECT email, min(id) AS id FROM customers WHERE email IS NOT NULL GROUP BY email) c "
+            f"WHERE s.email = c.email"
+        ))
+        # Existing customers by phone, used once a row's email cannot match a new customer
+        self.db.execute(text(
+            f"UPDATE {STAGING_TABLE} s SET phone_customer_id = c.id "
+            f"FROM (SELECT whatsapp_number, min(id) AS id FROM customers "
+            f"WHERE whatsapp_number IS NOT NULL GROUP BY whatsapp_number) c "
+            f"WHERE s.customer_id IS NULL AND s.whatsapp = c.whatsapp_number"
+        ))
+
+        # No earlier row with the same email is undecided or creates a customer
+        email_settled = (
+            f"(s.email IS NULL OR NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} o "
+            f"WHERE o.email = s.email AND o.row_number < s.row_number "
+            f"AND (o.customer_id IS NULL OR o.creates_customer)))"
+        )
+        # Likewise for the phone
+        phone_settled = (
+            f"(s.whatsapp IS NULL OR NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} o "
+            f"WHERE o.whatsapp = s.whatsapp AND o.row_number < s.row_number "
+            f"AND (o.customer_id IS NULL OR o.creates_customer)))"
+        )
+        sequence = "pg_get_serial_sequence('customers', 'id')"
+        rounds = (
+            # Email of a customer created by an earlier row
+            f"UPDATE {STAGING_TABLE} s SET customer_id = c.customer_id "
+            f"FROM {STAGING_TABLE} c "
+            f"WHERE s.customer_id IS NULL AND c.creates_customer "
+            f"AND c.email = s.email AND c.row_number < s.row_number",
+            # Phone of an existing customer
+            f"UPDATE {STAGING_TABLE} s SET customer_id = s.phone_customer_id "
+            f"WHERE s.customer_id IS NULL AND s.phone_customer_id IS NOT NULL AND {email_settled}",
+            # Phone of the first customer created by an earlier row
+            f"UPDATE {STAGING_TABLE} s SET customer_id = c.customer_id "
+            f"FROM (SELECT DISTINCT ON (whatsapp) whatsapp, row_number, customer_id FROM {STAGING_TABLE} "
+            f"WHERE creates_customer AND whatsapp IS NOT NULL ORDER BY whatsapp, row_number) c "
+            f"WHERE s.customer_id IS NULL AND s.whatsapp = c.whatsapp AND c.row_number < s.row_number "
+            f"AND {email_settled}",
+            # Nothing to match: the row creates a customer
+            f"UPDATE {STAGING_TABLE} s SET customer_id = nextval({sequence}), creates_customer = TRUE "
+            f"WHERE s.customer_id IS NULL AND s.phone_customer_id IS NULL "
+            f"AND {email_settled} AND {phone_settled}",
+        )
+        while sum(self.db.execute(text(statement)).rowcount for statement in rounds):
+            pass
+
+        # Each new customer takes its details from the row that created it
+        self.db.execute(
+            text(
+                f"INSERT INTO customers (id, full_name, email, whatsapp_number, created_at, updated_at) "
+                f"SELECT customer_id, full_name, email, whatsapp, :now, :now "
+                f"FROM {STAGING_TABLE} WHERE creates_customer"
+            ),
+            {"now": now},
+        )
+
+    def _resolve_vehicles(self, now: datetime) -> None:
+        """Insert vehicles with new registrations and resolve every row's vehicle."""
+        self.db.execute(
+            text(
+                f"INSERT INTO vehicles (registration, make_model, color, created_at, updated_at) "
+                f"SELECT DISTINCT ON (registration) registration, make_model, color, :now, :now "
+                f"FROM {STAGING_TABLE} ORDER BY registration, row_number "
+                f"ON CONFLICT (registration) DO NOTHING"
+            ),
+            {"now": now},
+        )
+        self.db.execute(text(
+            f"UPDATE {STAGING_TABLE} s SET vehicle_id = v.id "
+            f"FROM vehicles v WHERE v.registration = s.registration"
+        ))
+
+    def _insert_bookings(self, source: str, now: datetime) -> None:
+        """Insert bookings and record their IDs in staging."""
+        self.db.execute(
+            text(
+                f"WITH inserted AS ("
+                f"INSERT INTO bookings (source, source_row_id, customer_id, vehicle_id, flight_type, "
+                f"dropoff_at, pickup_at, payment_method, special_instructions, cost, status, "
+                f"note_count, created_at, updated_at) "
+                f"SELECT :source, source_row_id, customer_id, vehicle_id, flight_type::flighttype, "
+                f"dropoff_at, pickup_at, payment_method::paymentmethod, special_instructions, cost, "
+                f"'booked'::bookingstatus, 0, created_at, :now "
+                f"FROM {STAGING_TABLE} ORDER BY row_number "
+                f"ON CONFLICT ON CONSTRAINT uq_booking_source_row DO NOTHING "
+                f"RETURNING id, source_row_id) "
+                f"UPDATE {STAGING_TABLE} s SET booking_id = i.id "
+                f"FROM inserted i WHERE s.source_row_id = i.source_row_id"
+            ),
+            {"source": source, "now": now},
+        )
+
+    def _apply_revenue(self) -> None:
+        """Add the imported bookings to the daily revenue rollup."""
+        rows = self.db.execute(
+            text(
+                f"SELECT (created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz)::date AS day, "
+                f"flight_type, payment_method, count(*), sum(cost) "
+                f"FROM {STAGING_TABLE} WHERE booking_id IS NOT NULL "
+                f"GROUP BY 1, 2, 3"
+            ),
+            {"tz": settings.TIMEZONE},
+        ).all()
+        deltas = RevenueRollupService.new_deltas()
+        for day, flight_type, payment_method, count, revenue in rows:
+            deltas[(day, FlightType[flight_type], PaymentMethod[payment_method])] = [count, Decimal(revenue)]
+        RevenueRollupService.apply_deltas(self.db, deltas)
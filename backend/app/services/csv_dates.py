@@ -0,0 +1,102 @@
+"""
+Date and timestamp formats for CSV imports.
+
+Each format is parsed with a pre-compiled regex instead of datetime.strptime,
+and date strings (which repeat heavily across bookings) are memoized per
+format. detect_format samples a column once so an import can lock in one
+format instead of trying several per value; this also settles the ambiguous
+DD/MM vs M/D choice for the whole file rather than per row.
+"""
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional, Iterable, Tuple
+
+# Distinct date strings remembered per format
+DATE_CACHE_SIZE = 4096
+
+_TIME = r" (\d{1,2}):(\d{1,2}):(\d{1,2})"
+
+
+class DateFormat:
+    """A day/month/year layout with fast date and timestamp parsers."""
+
+    def __init__(self, name: str, pattern: str, year: int, month: int, day: int):
+        self.name = name
+        self._date = re.compile(pattern)
+        self._timestamp = re.compile(pattern + _TIME)
+        self._groups = (year, month, day)
+        self.parse_date = lru_cache(maxsize=DATE_CACHE_SIZE)(self._parse_date)
+
+    def __repr__(self) -> str:
+        return f"DateFormat({self.name!r})"
+
+    def __reduce__(self):
+        # Pickle by name so formats can be sent to parse workers
+        return (date_format, (self.name,))
+
+    def _parse_date(self, value: str) -> Optional[date]:
+        """Parse a stripped date string, or None if it does not fit this format."""
+        match = self._date.fullmatch(value)
+        if not match:
+            return None
+        year, month, day = self._groups
+        try:
+            return date(int(match[year]), int(match[month]), int(match[day]))
+        except ValueError:
+            return None
+
+    def parse_timestamp(self, value: str) -> Optional[datetime]:
+        """Parse a stripped "<date> H:MM:SS" string, or None if it does not fit."""
+        match = self._timestamp.fullmatch(value)
+        if not match:
+            return None
+        year, month, day = self._groups
+        try:
+            return datetime(
+                int(match[year]), int(match[month]), int(match[day]),
+                int(match[4]), int(match[5]), int(match[6]),
+            )
+        except ValueError:
+            return None
+
+
+DD_MM_YYYY = DateFormat("DD/MM/YYYY", r"(\d{1,2})/(\d{1,2})/(\d{4})", 3, 2, 1)
+M_D_YYYY = DateFormat("M/D/YYYY", r"(\d{1,2})/(\d{1,2})/(\d{4})", 3, 1, 2)
+YYYY_MM_DD = DateFormat("YYYY-MM-DD", r"(\d{4})-(\d{1,2})-(\d{1,2})", 1, 2, 3)
+
+# Candidates in order of preference, as tried per value before detection
+DATE_FORMATS: Tuple[DateFormat, ...] = (DD_MM_YYYY, M_D_YYYY, YYYY_MM_DD)
+TIMESTAMP_FORMATS: Tuple[DateFormat, ...] = (M_D_YYYY, DD_MM_YYYY)
+
+_BY_NAME = {fmt.name: fmt for fmt in DATE_FORMATS}
+
+
+def date_format(name: str) -> DateFormat:
+    """Look up a format by name."""
+    return _BY_NAME[name]
+
+
+def detect_format(
+    values: Iterable[str], formats: Tuple[DateFormat, ...], timestamps: bool = False
+) -> Optional[DateFormat]:
+    """
+    Pick the format for a column from a sample of its values.
+
+    Args:
+        values: Sampled column values; blanks are ignored
+        formats: Candidate formats in order of preference
+        timestamps: Match values as timestamps rather than dates
+
+    Returns:
+        The format that parses the most sampled values (the earliest
+        candidate on ties), or None if it parses none of them
+    """
+    samples = [value.strip() for value in values if value and value.strip()]
+    best, best_hits = None, 0
+    for fmt in formats:
+        parse = fmt.parse_timestamp if timestamps else fmt.parse_date
+        hits = sum(1 for value in samples if parse(value) is not None)
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
@@ -0,0 +1,199 @@
+"""
+Background CSV import jobs.
+
+An upload is saved to a temporary file and queued; a small worker pool runs
+the importer on it with its own database session. The importer's stats dict
+is updated as rows are processed, so polling a job reports live progress.
+Jobs are kept in memory for CSV_IMPORT_JOB_TTL_SECONDS after they finish;
+with several server processes, poll the process that accepted the upload.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, List, BinaryIO
+
+from ..config import settings
+from ..db import SessionLocal
+from .csv_copy_importer import CSVCopyImporter
+from .csv_importer import CSVImportError
+
+logger = logging.getLogger(__name__)
+
+# Errors included in a job status response
+MAX_REPORTED_ERRORS = 50
+
+_lock = threading.Lock()
+_jobs: Dict[str, "ImportJob"] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+class ImportJob:
+    """State of one background import."""
+
+    def __init__(self, filename: str, path: str, source: str):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.path = path
+        self.source = source
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.importer: Optional[CSVCopyImporter] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        """Record the outcome and remove the saved upload."""
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.utcnow()
+        self._finished = time.monotonic()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def to_dict(self) -> dict:
+        """
+        Snapshot of the job's progress for status responses.
+
+        The import commits once at the end, so rows written by a running job
+        are reported as uncommitted; successful stays 0 unless it completed.
+        """
+        stats = self.importer.stats if self.importer else {}
+        errors = list(stats.get("errors", []))
+        processed = stats.get("total_rows", 0)
+        written = stats.get("successful", 0)
+        elapsed = None
+        if self._started is not None:
+            elapsed = (self._finished or time.monotonic()) - self._started
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "statistics": {
+                "total_rows": processed,
+                "successful": written if self.status == "completed" else 0,
+                "uncommitted": written if self.status == "running" else 0,
+                "failed": stats.get("failed", 0),
+                "skipped": stats.get("skipped", 0),
+            },
+            "elapsed_seconds": round(elapsed, 2) if elapsed is not None else None,
+            "rows_per_second": round(processed / elapsed, 1) if elapsed else None,
+            "errors": errors[:MAX_REPORTED_ERRORS],
+            "error_count": stats.get("failed", 0),
+        }
+
+
+class ImportJobService:
+    """Creates background import jobs and reports their status."""
+
+    @staticmethod
+    def submit(upload: BinaryIO, filename: str, source: str = "api_upload") -> ImportJob:
+        """
+        Save an upload to a temporary file and queue it for import.
+
+        Args:
+            upload: Binary file object with the CSV content
+            filename: Original file name, for status reports
+            source: Booking source recorded on imported rows
+
+        Returns:
+            The queued job
+        """
+        fd, path = tempfile.mkstemp(prefix="csv_import_", suffix=".csv", dir=settings.CSV_IMPORT_DIR)
+        with os.fdopen(fd, "wb") as target:
+            shutil.copyfileobj(upload, target)
+
+        job = ImportJob(filename, path, source)
+        with _lock:
+            ImportJobService._evict_finished()
+            _jobs[job.id] = job
+        _get_executor().submit(ImportJobService._run, job)
+        return job
+
+    @staticmethod
+    def get(job_id: str) -> Optional[ImportJob]:
+        """Get a job by ID, or None if unknown or expired."""
+        with _lock:
+            return _jobs.get(job_id)
+
+    @staticmethod
+    def list_jobs() -> List[ImportJob]:
+        """All known jobs, newest first."""
+        with _lock:
+            ImportJobService._evict_finished()
+            jobs = list(_jobs.values())
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    @staticmethod
+    def _run(job: ImportJob) -> None:
+        """Worker entry point: import the saved file and record the outcome."""
+        db = SessionLocal()
+        job.importer = CSVCopyImporter(db)
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        job._started = time.monotonic()
+        try:
+            with open(job.path, "rb") as f:
+                job.importer.import_from_stream(f, source=job.source)
+            job.finish("completed")
+        except UnicodeDecodeError:
+            job.finish("failed", "File encoding error. Please ensure the file is UTF-8 encoded.")
+        except CSVImportError as e:
+            job.finish("failed", str(e))
+        except Exception as e:
+            logger.exception("CSV import job %s failed", job.id)
+            job.finish("failed", f"Unexpected error during import: {str(e)}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _evict_finished() -> None:
+        """Forget finished jobs older than the TTL. Caller holds _lock."""
+        cutoff = time.monotonic() - settings.CSV_IMPORT_JOB_TTL_SECONDS
+        expired = [
+            job_id for job_id, job in _jobs.items()
+            if job._finished is not None and job._finished < cutoff
+        ]
+        for job_id in expired:
+            del _jobs[job_id]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Worker pool, created on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CSV_IMPORT_WORKERS, thread_name_prefix="csv-import"
+            )
+        return _executor
+
+
+def stop_import_workers() -> None:
+    """
+    Wait for running imports to finish and shut the worker pool down.
+    Jobs that never started are marked cancelled and their uploads deleted.
+    """
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+    with _lock:
+        queued = [job for job in _jobs.values() if job.status == "queued"]
+    for job in queued:
+        job.finish("cancelled", "Server shut down before the import started")
@@ -5,14 +5,24 @@ Handles importing booking data from CSV files into the database.
 Supports customer and vehicle deduplication.
 """
 import csv
+import io
+import multiprocessing
+import os
 import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date, time
-from typing import Optional, Dict, Tuple
+from types import SimpleNamespace
+from itertools import islice, chain
+from typing import Optional, Dict, Tuple, List, Iterable, Iterator, NamedTuple, BinaryIO
 from pathlib import Path
 from io import StringIO
 
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 
+from ..config import settings
 from ..models import (
     Customer,
     Vehicle,
@@ -20,7 +30,25 @@ from ..models import (
     FlightType,
     PaymentMethod,
     BookingStatus,
+    AuditEventType,
 )
+from .audit.audit_writer import AuditWriter, audit_event
+from .csv_dates import DateFormat, DATE_FORMATS, TIMESTAMP_FORMATS, detect_format
+from .reports.revenue_rollup import RevenueRollupService
+
+
+# Values per IN (...) list when prefetching existing records
+PREFETCH_CHUNK_SIZE = 1000
+
+# Columns whose date format is detected once per file: column -> (candidates, timestamps)
+DATE_COLUMNS = {
+    "Timestamp": (TIMESTAMP_FORMATS, True),
+    "Departure Date": (DATE_FORMATS, False),
+    "Arrival Date": (DATE_FORMATS, False),
+}
+
+_parse_pool_lock = threading.Lock()
+_parse_pool: Optional[ProcessPoolExecutor] = None
 
 
 class CSVImportError(Exception):
@@ -28,6 +56,37 @@ class CSVImportError(Exception):
     pass
 
 
+class ParsedRow(NamedTuple):
+    """A validated CSV row with normalized values, ready to insert."""
+    source_row_id: str
+    full_name: str
+    email: Optional[str]
+    whatsapp: Optional[str]
+    registration: str
+    make_model: str
+    color: Optional[str]
+    flight_type: FlightType
+    dropoff_at: datetime
+    pickup_at: datetime
+    payment_method: PaymentMethod
+    special_instructions: Optional[str]
+    cost: float
+    created_at: datetime
+
+
+class ParseResult(NamedTuple):
+    """Output of the parse stage for one CSV row; parsed and error are both None for empty rows."""
+    row_number: int
+    row: Dict[str, str]
+    parsed: Optional[ParsedRow]
+    error: Optional[str]
+
+
+class NewRecord(NamedTuple):
+    """Reference to a customer or vehicle that a bulk import will insert."""
+    index: int
+
+
 class CSVImporter:
     """
     Service class for importing CSV booking data.
@@ -39,8 +98,10 @@ class CSVImporter:
     or registration), but existing records are not modified.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, parse_workers: Optional[int] = None):
         self.db = db
+        # Parse-stage processes: None uses CSV_PARSE_WORKERS, 0 one per CPU
+        self.parse_worker_count = parse_workers
         self.stats = {
             "total_rows": 0,
             "successful": 0,
@@ -48,6 +109,8 @@ class CSVImporter:
             "skipped": 0,
             "errors": [],
         }
+        # Date format per column, detected by _iter_reader
+        self.column_formats: Dict[str, DateFormat] = {}
 
     def normalize_phone(self, phone: str) -> Optional[str]:
         """
@@ -79,40 +142,42 @@ class CSVImporter:
             return email
         return None
 
-    def parse_date(self, date_str: str) -> Optional[date]:
+    def parse_date(self, date_str: str, fmt: Optional[DateFormat] = None) -> Optional[date]:
         """
         Parse date from various formats:
         - DD/MM/YYYY
         - M/D/YYYY
+        - YYYY-MM-DD
+        With fmt (the format detected for the column) that format is tried first.
         """
         if not date_str or date_str.strip() == "":
             return None
         
         date_str = date_str.strip()
         
-        # Try DD/MM/YYYY format first (most common in CSV)
-        try:
-            return datetime.strptime(date_str, "%d/%m/%Y").date()
-        except ValueError:
-            pass
+        if fmt:
+            parsed = fmt.parse_date(date_str)
+            if parsed:
+                return parsed
         
-        # Try M/D/YYYY format
-        try:
-            return datetime.strptime(date_str, "%m/%d/%Y").date()
-        except ValueError:
-            pass
+        # Try DD/MM/YYYY format first (most common in CSV)
+        for candidate in DATE_FORMATS:
+            parsed = candidate.parse_date(date_str)
+            if parsed:
+                return parsed
         
-        # Try YYYY-MM-DD
-        try:
-            return datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            pass
+        # strptime also accepts a space-padded day, e.g. "1/ 2/2025"
+        for pattern in ("%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(date_str, pattern).date()
+            except ValueError:
+                pass
         
         return None
 
-    def parse_datetime(self, date_str: str, time_str: str) -> Optional[datetime]:
+    def parse_datetime(self, date_str: str, time_str: str, fmt: Optional[DateFormat] = None) -> Optional[datetime]:
         """Parse date and time into datetime object"""
-        date_obj = self.parse_date(date_str)
+        date_obj = self.parse_date(date_str, fmt)
         if not date_obj:
             return None
         
@@ -143,27 +208,34 @@ class CSVImporter:
         
         return None
 
-    def parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
+    def parse_timestamp(self, timestamp_str: str, fmt: Optional[DateFormat] = None) -> Optional[datetime]:
         """
         Parse booking creation timestamp.
         Format: M/D/YYYY H:MM:SS
+        With fmt (the format detected for the column) that format is tried first.
         """
         if not timestamp_str or timestamp_str.strip() == "":
             return None
         
         timestamp_str = timestamp_str.strip()
         
-        # Try M/D/YYYY H:MM:SS format
-        try:
-            return datetime.strptime(timestamp_str, "%m/%d/%Y %H:%M:%S")
-        except ValueError:
-            pass
+        if fmt:
+            parsed = fmt.parse_timestamp(timestamp_str)
+            if parsed:
+                return parsed
         
-        # Try DD/MM/YYYY H:MM:SS
-        try:
-            return datetime.strptime(timestamp_str, "%d/%m/%Y %H:%M:%S")
-        except ValueError:
-            pass
+        # Try M/D/YYYY H:MM:SS, then DD/MM/YYYY H:MM:SS
+        for candidate in TIMESTAMP_FORMATS:
+            parsed = candidate.parse_timestamp(timestamp_str)
+            if parsed:
+                return parsed
+        
+        # strptime also accepts a space-padded day, e.g. "1/ 2/2025"
+        for pattern in ("%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S"):
+            try:
+                return datetime.strptime(timestamp_str, pattern)
+            except ValueError:
+                pass
         
         # Try ISO format
         try:
@@ -220,6 +292,10 @@ class CSVImporter:
         self.db.add(customer)
         return customer
 
+    def normalize_registration(self, registration: str) -> str:
+        """Normalize registration (uppercase, remove extra spaces)"""
+        return re.sub(r"\s+", " ", registration.strip().upper())
+
     def find_or_create_vehicle(
         self, registration: str, make_model: str, color: Optional[str]
     ) -> Vehicle:
@@ -230,8 +306,7 @@ class CSVImporter:
         Note: Same vehicle can be used in multiple bookings.
         We only deduplicate the Vehicle entity itself.
         """
-        # Normalize registration (uppercase, remove extra spaces)
-        normalized_reg = re.sub(r"\s+", " ", registration.strip().upper())
+        normalized_reg = self.normalize_registration(registration)
         
         # Try to find existing vehicle
         vehicle = (
@@ -265,84 +340,114 @@ class CSVImporter:
         except (ValueError, TypeError):
             return 0.0
 
+    def parse_row(self, row: Dict[str, str], row_number: int) -> Tuple[Optional[ParsedRow], Optional[str]]:
+        """
+        Parse and validate a CSV row without touching the database.
+        Returns (parsed_row, error_message)
+        """
+        # Extract and validate required fields
+        full_name = row.get("Full Names", "").strip()
+        if not full_name:
+            return None, "Full name is required"
+        
+        # Parse timestamp (booking creation time)
+        timestamp_str = row.get("Timestamp", "")
+        created_at = self.parse_timestamp(timestamp_str, self.column_formats.get("Timestamp"))
+        if not created_at:
+            created_at = datetime.utcnow()  # Fallback to current time
+        
+        # Parse dates and times
+        departure_date = row.get("Departure Date", "")
+        dropoff_time = row.get("Vehicle Drop off Time", "").strip()
+        arrival_date = row.get("Arrival Date", "")
+        pickup_time = row.get("Vehicle Pick -up Time", "").strip()
+        
+        dropoff_at = self.parse_datetime(departure_date, dropoff_time, self.column_formats.get("Departure Date"))
+        pickup_at = self.parse_datetime(arrival_date, pickup_time, self.column_formats.get("Arrival Date"))
+        
+        if not dropoff_at:
+            return None, f"Invalid dropoff date/time: {departure_date} {dropoff_time}"
+        if not pickup_at:
+            return None, f"Invalid pickup date/time: {arrival_date} {pickup_time}"
+        
+        if pickup_at <= dropoff_at:
+            return None, "Pickup time must be after dropoff time"
+        
+        # Parse flight type
+        flight_type_str = row.get("Type of Flight", "").strip().lower()
+        if flight_type_str == "international":
+            flight_type = FlightType.international
+        elif flight_type_str == "domestic":
+            flight_type = FlightType.domestic
+        else:
+            return None, f"Invalid flight type: {flight_type_str}"
+        
+        # Parse payment method
+        payment_str = row.get("Payment Method", "").strip().lower()
+        if payment_str == "eft":
+            payment_method = PaymentMethod.eft
+        elif payment_str == "cash":
+            payment_method = PaymentMethod.cash
+        else:
+            payment_method = PaymentMethod.cash  # Default
+        
+        registration = row.get("Vehicle Registration", "").strip()
+        make_model = row.get("Vehicle Make and Model", "").strip()
+        color = row.get("Vehicle Color", "").strip()
+        
+        if not registration:
+            return None, "Vehicle registration is required"
+        if not make_model:
+            return None, "Vehicle make/model is required"
+        
+        # Get special instructions
+        special_instructions = row.get("Special Instructions", "").strip()
+        if not special_instructions or special_instructions.lower() in ["none", "no", "na", ""]:
+            special_instructions = None
+        
+        email = row.get("Email", "")
+        whatsapp = row.get("WhatsApp number", "")
+        
+        return ParsedRow(
+            source_row_id=f"row_{row_number}",
+            full_name=full_name,
+            email=self.normalize_email(email) if email else None,
+            whatsapp=self.normalize_phone(whatsapp) if whatsapp else None,
+            registration=self.normalize_registration(registration),
+            make_model=make_model,
+            color=color or None,
+            flight_type=flight_type,
+            dropoff_at=dropoff_at,
+            pickup_at=pickup_at,
+            payment_method=payment_method,
+            special_instructions=special_instructions,
+            cost=self.parse_cost(row.get("cost", "0")),
+            created_at=created_at,
+        ), None
+
     def import_row(self, row: Dict[str, str], row_number: int, source: str = "csv") -> Tuple[bool, Optional[str]]:
         """
         Import a single CSV row into the database.
         Returns (success, error_message)
         """
         try:
-            # Extract and validate required fields
-            full_name = row.get("Full Names", "").strip()
-            if not full_name:
-                return False, "Full name is required"
-            
-            # Parse timestamp (booking creation time)
-            timestamp_str = row.get("Timestamp", "")
-            created_at = self.parse_timestamp(timestamp_str)
-            if not created_at:
-                created_at = datetime.utcnow()  # Fallback to current time
-            
-            # Parse dates and times
-            departure_date = row.get("Departure Date", "")
-            dropoff_time = row.get("Vehicle Drop off Time", "").strip()
-            arrival_date = row.get("Arrival Date", "")
-            pickup_time = row.get("Vehicle Pick -up Time", "").strip()
-            
-            dropoff_at = self.parse_datetime(departure_date, dropoff_time)
-            pickup_at = self.parse_datetime(arrival_date, pickup_time)
-            
-            if not dropoff_at:
-                return False, f"Invalid dropoff date/time: {departure_date} {dropoff_time}"
-            if not pickup_at:
-                return False, f"Invalid pickup date/time: {arrival_date} {pickup_time}"
-            
-            if pickup_at <= dropoff_at:
-                return False, "Pickup time must be after dropoff time"
-            
-            # Parse flight type
-            flight_type_str = row.get("Type of Flight", "").strip().lower()
-            if flight_type_str == "international":
-                flight_type = FlightType.international
-            elif flight_type_str == "domestic":
-                flight_type = FlightType.domestic
-            else:
-                return False, f"Invalid flight type: {flight_type_str}"
-            
-            # Parse payment method
-            payment_str = row.get("Payment Method", "").strip().lower()
-            if payment_str == "eft":
-                payment_method = PaymentMethod.eft
-            elif payment_str == "cash":
-                payment_method = PaymentMethod.cash
-            else:
-                payment_method = PaymentMethod.cash  # Default
+            parsed, error = self.parse_row(row, row_number)
+            if error:
+                return False, error
             
             # Get customer and vehicle
-            email = row.get("Email", "")
-            whatsapp = row.get("WhatsApp number", "")
-            customer = self.find_or_create_customer(full_name, email, whatsapp)
-            
-            registration = row.get("Vehicle Registration", "").strip()
-            make_model = row.get("Vehicle Make and Model", "").strip()
-            color = row.get("Vehicle Color", "").strip()
-            
-            if not registration:
-                return False, "Vehicle registration is required"
-            if not make_model:
-                return False, "Vehicle make/model is required"
-            
-            vehicle = self.find_or_create_vehicle(registration, make_model, color)
+            customer = self.find_or_create_customer(parsed.full_name, parsed.email, parsed.whatsapp)
+            vehicle = self.find_or_create_vehicle(parsed.registration, parsed.make_model, parsed.color)
             
             # Flush to get IDs for customer and vehicle
             self.db.flush()
             
             # Check if booking already exists (by source and row identifier)
-            source_row_id = f"row_{row_number}"
             existing_booking = (
                 self.db.query(Booking)
                 .filter(
                     Booking.source == source,
-                    Booking.source_row_id == source_row_id,
+                    Booking.source_row_id == parsed.source_row_id,
                 )
                 .first()
             )
@@ -350,41 +455,304 @@ class CSVImporter:
             if existing_booking:
                 return False, "Booking already exists (duplicate row)"
             
-            # Parse cost
-            cost = self.parse_cost(row.get("cost", "0"))
-            
-            # Get special instructions
-            special_instructions = row.get("Special Instructions", "").strip()
-            if not special_instructions or special_instructions.lower() in ["none", "no", "na", ""]:
-                special_instructions = None
-            
             # Create booking
             booking = Booking(
                 source=source,
-                source_row_id=source_row_id,
+                source_row_id=parsed.source_row_id,
                 customer_id=customer.id,
                 vehicle_id=vehicle.id,
-                flight_type=flight_type,
-                dropoff_at=dropoff_at,
-                pickup_at=pickup_at,
-                payment_method=payment_method,
-                special_instructions=special_instructions,
-                cost=cost,
+                flight_type=parsed.flight_type,
+                dropoff_at=parsed.dropoff_at,
+                pickup_at=parsed.pickup_at,
+                payment_method=parsed.payment_method,
+                special_instructions=parsed.special_instructions,
+                cost=parsed.cost,
                 status=BookingStatus.booked,
-                created_at=created_at,
+                created_at=parsed.created_at,
             )
             
             self.db.add(booking)
             self.db.flush()
             
+            RevenueRollupService.record_change(self.db, None, RevenueRollupService.contribution(booking))
+            AuditWriter.record(self.db, [
+                audit_event(booking.id, AuditEventType.created, f"Booking imported from {source}")
+            ])
+            
             return True, None
             
         except Exception as e:
             return False, f"Unexpected error: {str(e)}"
 
-    def import_from_file(self, file_path: Path, source: str = "csv") -> Dict:
+    def parse_result(self, row_number: int, row: Dict[str, str]) -> ParseResult:
+        """Parse one row for the parse stage, marking empty rows as skipped."""
+        if not any(row.values()):
+            return ParseResult(row_number, row, None, None)
+        parsed, error = self.parse_row(row, row_number)
+        return ParseResult(row_number, row, parsed, error)
+
+    def parse_workers(self) -> int:
+        """Processes for the parse stage; 1 parses in this process."""
+        workers = settings.CSV_PARSE_WORKERS if self.parse_worker_count is None else self.parse_worker_count
+        return workers or os.cpu_count() or 1
+
+    def parse_rows(self, rows: Iterable[Tuple[int, Dict[str, str]]]) -> Iterator[ParseResult]:
+        """
+        Parse stage of a bulk import: parse and validate rows without
+        touching the database, yielding results in input order.
+        
+        With more than one parse worker, rows are sent to a shared process
+        pool in chunks of CSV_PARSE_CHUNK_SIZE and parsed ahead while the
+        caller writes earlier results. Inputs with less than one chunk per
+        worker are parsed here, where the pool would not pay for itself.
+        """
+        chunk_size = settings.CSV_PARSE_CHUNK_SIZE
+        workers = self.parse_workers()
+        rows = iter(rows)
+        head = list(islice(rows, chunk_size * workers)) if workers > 1 else []
+        if len(head) < chunk_size * workers:
+            for row_number, row in chain(head, rows):
+                yield self.parse_result(row_number, row)
+            return
+        
+        pool = _get_parse_pool(workers)
+        rows = chain(head, rows)
+        pending = deque()
+        try:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if chunk:
+                    pending.append((chunk, pool.submit(_parse_chunk, type(self), self.column_formats, chunk)))
+                    # Keep a couple of chunks per worker in flight
+                    if len(pending) < workers * 2:
+                        continue
+                if not pending:
+                    break
+                chunk, future = pending.popleft()
+                for (row_number, row), (values, error) in zip(chunk, future.result()):
+                    parsed = ParsedRow(*values) if values else None
+                    yield ParseResult(row_number, row, parsed, error)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def import_rows_bulk(self, rows: Iterable[Tuple[int, Dict[str, str]]], source: str = "csv") -> None:
+        """
+        Set-based import of many rows, updating self.stats.
+        Parses the rows (see parse_rows) and writes them with import_parsed_bulk.
+        """
+        self.import_parsed_bulk(self.parse_rows(rows), source)
+
+    def import_parsed_bulk(self, results: Iterable[ParseResult], source: str = "csv") -> None:
+        """
+        Writer stage of a bulk import: insert parsed rows set-based, updating
+        self.stats.
+        
+        Existing customers, vehicles and bookings are prefetched with a few
+        IN (...) queries into dicts, and new customers, vehicles and bookings
+        are written with multi-row inserts. Deduplication follows import_row:
+        customers by email then phone, vehicles by registration, bookings by
+        (source, source_row_id). Runs inside the caller's transaction.
+        """
+        parsed_rows: List[Tuple[int, ParsedRow, Dict[str, str]]] = []
+        errors = []
+        for row_number, row, parsed, error in results:
+            self.stats["total_rows"] += 1
+            if error:
+                errors.append((row_number, error, row))
+            elif parsed:
+                parsed_rows.append((row_number, parsed, row))
+            else:
+                self.stats["skipped"] += 1
+        
+        existing_rows = self._prefetch(
+            Booking.source_row_id,
+            {parsed.source_row_id for _, parsed, _ in parsed_rows},
+            Booking.source == source,
+        )
+        customers_by_email = self._prefetch(Customer.email, {p.email for _, p, _ in parsed_rows if p.email})
+        customers_by_phone = self._prefetch(
+            Customer.whatsapp_number, {p.whatsapp for _, p, _ in parsed_rows if p.whatsapp}
+        )
+        vehicles = self._prefetch(Vehicle.registration, {p.registration for _, p, _ in parsed_rows})
+        
+        # Resolve each row to an existing ID or the index of a new record
+        new_customers: List[dict] = []
+        new_vehicles: List[dict] = []
+        accepted = []
+        for row_number, parsed, row in parsed_rows:
+            if parsed.source_row_id in existing_rows:
+                errors.append((row_number, "Booking already exists (duplicate row)", row))
+                continue
+            
+            customer_ref = (
+                customers_by_email.get(parsed.email) if parsed.email else None
+            ) or (
+                customers_by_phone.get(parsed.whatsapp) if parsed.whatsapp else None
+            )
+            if customer_ref is None:
+                customer_ref = NewRecord(len(new_customers))
+                new_customers.append({
+                    "full_name": parsed.full_name,
+                    "email": parsed.email,
+                    "whatsapp_number": parsed.whatsapp,
+                })
+                if parsed.email:
+                    customers_by_email[parsed.email] = customer_ref
+                if parsed.whatsapp:
+                    customers_by_phone.setdefault(parsed.whatsapp, customer_ref)
+            
+            vehicle_ref = vehicles.get(parsed.registration)
+            if vehicle_ref is None:
+                vehicle_ref = NewRecord(len(new_vehicles))
+                new_vehicles.append({
+                    "registration": parsed.registration,
+                    "make_model": parsed.make_model,
+                    "color": parsed.color,
+                })
+                vehicles[parsed.registration] = vehicle_ref
+            
+            accepted.append((parsed, customer_ref, vehicle_ref))
+        
+        customer_ids = self._insert_returning_ids(Customer, new_customers)
+        vehicle_ids = self._insert_returning_ids(Vehicle, new_vehicles)
+        
+        bookings = [
+            {
+                "source": source,
+                "source_row_id": parsed.source_row_id,
+                "customer_id": customer_ids[customer_ref.index] if isinstance(customer_ref, NewRecord) else customer_ref,
+                "vehicle_id": vehicle_ids[vehicle_ref.index] if isinstance(vehicle_ref, NewRecord) else vehicle_ref,
+                "flight_type": parsed.flight_type,
+                "dropoff_at": parsed.dropoff_at,
+                "pickup_at": parsed.pickup_at,
+                "payment_method": parsed.payment_method,
+                "special_instructions": parsed.special_instructions,
+                "cost": parsed.cost,
+                "status": BookingStatus.booked,
+                "created_at": parsed.created_at,
+            }
+            for parsed, customer_ref, vehicle_ref in accepted
+        ]
+        booking_ids = self._insert_returning_ids(Booking, bookings)
+        
+        deltas = RevenueRollupService.new_deltas()
+        for booking in bookings:
+            RevenueRollupService.add_delta(deltas, None, RevenueRollupService.contribution(SimpleNamespace(**booking)))
+        RevenueRollupService.apply_deltas(self.db, deltas)
+        # Inserted with this chunk so an import's events are not held until the final commit
+        AuditWriter.record(self.db, (
+            audit_event(booking_id, AuditEventType.created, f"Booking imported from {source}")
+            for booking_id in booking_ids
+        ), synchronous=True)
+        
+        self.stats["successful"] += len(booking_ids)
+        self.stats["failed"] += len(errors)
+        for row_number, error, row in sorted(errors, key=lambda item: item[0]):
+            self.add_error(row_number, error, {k: v for k, v in row.items() if k})
+
+    def add_error(self, row_number: int, error: str, data: Dict[str, str]) -> None:
+        """
+        Keep the details of a failed row for the import report, up to
+        CSV_IMPORT_MAX_ERRORS rows; stats["failed"] counts every failure.
+        """
+        if len(self.stats["errors"]) < settings.CSV_IMPORT_MAX_ERRORS:
+            self.stats["errors"].append({"row": row_number, "error": error, "data": data})
+
+    def _prefetch(self, column, values: set, *criteria) -> Dict:
+        """Map column value -> row id for existing rows, in chunked IN (...) queries."""
+        values = list(values)
+        table = column.class_
+        found = {}
+        for start in range(0, len(values), PREFETCH_CHUNK_SIZE):
+            chunk = values[start:start + PREFETCH_CHUNK_SIZE]
+            rows = self.db.execute(
+                select(column, table.id).where(column.in_(chunk), *criteria).order_by(table.id)
+            ).all()
+            for value, row_id in rows:
+                # Keep the first match, like .first() in the per-row path
+                found.setdefault(value, row_id)
+        return found
+
+    def _insert_returning_ids(self, model, rows: List[dict]) -> List[int]:
+        """Multi-row insert returning the new IDs in the order of rows."""
+        if not rows:
+            return []
+        return list(self.db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        ).scalars())
+
+    def detect_column_formats(self, rows: List[Dict[str, str]]) -> None:
+        """Lock in the date format of each date column from a sample of rows."""
+        self.column_formats = {}
+        for column, (formats, timestamps) in DATE_COLUMNS.items():
+            fmt = detect_format((row.get(column) for row in rows), formats, timestamps)
+            if fmt:
+                self.column_formats[column] = fmt
+
+    def _iter_reader(self, f) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        Detect the delimiter and the date formats (from the first
+        CSV_DATE_SAMPLE_ROWS rows) and yield (row_number, row) pairs.
+        """
+        # Detect delimiter, default to comma if detection fails
+        sample = f.read(1024)
+        f.seek(0)
+        delimiter = ","
+        try:
+            sniffer = csv.Sniffer()
+            delimiter = sniffer.sniff(sample).delimiter
+        except (csv.Error, AttributeError):
+            # Default to comma if delimiter detection fails
+            delimiter = ","
+        
+        reader = csv.DictReader(f, delimiter=delimiter)
+        sample = list(islice(reader, settings.CSV_DATE_SAMPLE_ROWS))
+        self.detect_column_formats(sample)
+        return enumerate(chain(sample, reader), start=2)  # Start at 2 (row 1 is header)
+
+    def bulk_chunk_size(self) -> Optional[int]:
+        """Rows per import_parsed_bulk call in bulk mode; None imports all rows at once."""
+        return settings.CSV_IMPORT_CHUNK_SIZE
+
+    def _import_reader(self, rows: Iterable[Tuple[int, Dict[str, str]]], source: str, bulk: bool) -> None:
+        """
+        Import rows one at a time, or when bulk is set, set-based in bounded
+        chunks fed by the parse stage.
+        """
+        if bulk:
+            results = self.parse_rows(rows)
+            chunk_size = self.bulk_chunk_size()
+            if not chunk_size:
+                self.import_parsed_bulk(results, source)
+                return
+            while True:
+                chunk = list(islice(results, chunk_size))
+                if not chunk:
+                    break
+                self.import_parsed_bulk(chunk, source)
+            return
+        
+        for row_num, row in rows:
+            self.stats["total_rows"] += 1
+            
+            # Skip empty rows
+            if not any(row.values()):
+                self.stats["skipped"] += 1
+                continue
+            
+            success, error = self.import_row(row, row_num, source)
+            
+            if success:
+                self.stats["successful"] += 1
+            else:
+                self.stats["failed"] += 1
+                self.add_error(row_num, error, {k: v for k, v in row.items() if k})
+
+    def import_from_file(self, file_path: Path, source: str = "csv", bulk: bool = False) -> Dict:
         """
         Import bookings from a CSV file.
+        With bulk=True rows are imported set-based (see import_rows_bulk).
         Returns statistics dictionary.
         """
         self.stats = {
@@ -397,38 +765,7 @@ class CSVImporter:
         
         try:
             with open(file_path, "r", encoding="utf-8") as f:
-                # Detect delimiter, default to comma if detection fails
-                sample = f.read(1024)
-                f.seek(0)
-                delimiter = ","
-                try:
-                    sniffer = csv.Sniffer()
-                    delimiter = sniffer.sniff(sample).delimiter
-                except (csv.Error, AttributeError):
-                    # Default to comma if delimiter detection fails
-                    delimiter = ","
-                
-                reader = csv.DictReader(f, delimiter=delimiter)
-                
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 (row 1 is header)
-                    self.stats["total_rows"] += 1
-                    
-                    # Skip empty rows
-                    if not any(row.values()):
-                        self.stats["skipped"] += 1
-                        continue
-                    
-                    success, error = self.import_row(row, row_num, source)
-                    
-                    if success:
-                        self.stats["successful"] += 1
-                    else:
-                        self.stats["failed"] += 1
-                        self.stats["errors"].append({
-                            "row": row_num,
-                            "error": error,
-                            "data": {k: v for k, v in row.items() if k},
-                        })
+                self._import_reader(self._iter_reader(f), source, bulk)
             
             # Commit all successful imports
             self.db.commit()
@@ -439,9 +776,49 @@ class CSVImporter:
         
         return self.stats
 
-    def import_from_string(self, csv_content: str, source: str = "csv") -> Dict:
+    def import_from_stream(
+        self, stream: BinaryIO, source: str = "csv", bulk: bool = True, encoding: str = "utf-8"
+    ) -> Dict:
+        """
+        Import bookings from a binary file object (e.g. an upload), decoding
+        it incrementally so memory use does not grow with the file size.
+        The stream must be seekable for delimiter detection.
+        Returns statistics dictionary.
+        
+        Raises:
+            UnicodeDecodeError: If the content is not valid in the given encoding
+        """
+        self.stats = {
+            "total_rows": 0,
+            "successful": 0,
+            "failed": 0,
+            "skipped": 0,
+            "errors": [],
+        }
+        
+        f = io.TextIOWrapper(stream, encoding=encoding, newline="")
+        try:
+            self._import_reader(self._iter_reader(f), source, bulk)
+            
+            # Commit all successful imports
+            self.db.commit()
+            
+        except UnicodeDecodeError:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            self.db.rollback()
+            raise CSVImportError(f"Failed to import CSV stream: {str(e)}")
+        finally:
+            # Leave the caller's stream open
+            f.detach()
+        
+        return self.stats
+
+    def import_from_string(self, csv_content: str, source: str = "csv", bulk: bool = False) -> Dict:
         """
         Import bookings from CSV content string.
+        With bulk=True rows are imported set-based (see import_rows_bulk).
         Returns statistics dictionary.
         """
         self.stats = {
@@ -455,39 +832,7 @@ class CSVImporter:
         try:
             # Use StringIO to treat string as file
             f = StringIO(csv_content)
-            
-            # Detect delimiter, default to comma if detection fails
-            sample = f.read(1024)
-            f.seek(0)
-            delimiter = ","
-            try:
-                sniffer = csv.Sniffer()
-                delimiter = sniffer.sniff(sample).delimiter
-            except (csv.Error, AttributeError):
-                # Default to comma if delimiter detection fails
-                delimiter = ","
-            
-            reader = csv.DictReader(f, delimiter=delimiter)
-            
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 (row 1 is header)
-                self.stats["total_rows"] += 1
-                
-                # Skip empty rows
-                if not any(row.values()):
-                    self.stats["skipped"] += 1
-                    continue
-                
-                success, error = self.import_row(row, row_num, source)
-                
-                if success:
-                    self.stats["successful"] += 1
-                else:
-                    self.stats["failed"] += 1
-                    self.stats["errors"].append({
-                        "row": row_num,
-                        "error": error,
-                        "data": {k: v for k, v in row.items() if k},
-                    })
+            self._import_reader(self._iter_reader(f), source, bulk)
             
             # Commit all successful imports
             self.db.commit()
@@ -498,3 +843,39 @@ class CSVImporter:
         
         return self.stats
 
+
+def _get_parse_pool(workers: int) -> ProcessPoolExecutor:
+    """Parse-stage process pool, created on first use and shared by imports."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # spawn rather than fork: the server process holds threads and pooled DB connections
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _parse_pool
+
+
+def stop_parse_workers() -> None:
+    """Shut the parse-stage process pool down."""
+    global _parse_pool
+    with _parse_pool_lock:
+        pool, _parse_pool = _parse_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _parse_chunk(
+    importer_class: type, column_formats: Dict[str, DateFormat], chunk: List[Tuple[int, Dict[str, str]]]
+) -> List[tuple]:
+    """
+    Parse-stage worker run in a child process. Returns (values, error) per
+    row, with ParsedRow fields as a plain tuple since those pickle faster.
+    """
+    parser = importer_class(None)
+    parser.column_formats = column_formats
+    results = []
+    for row_number, row in chunk:
+        result = parser.parse_result(row_number, row)
+        results.append((tuple(result.parsed) if result.parsed else None, result.error))
+    return results
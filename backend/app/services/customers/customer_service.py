@@ -0,0 +1,141 @@
+"""
+Customer service for the customer directory and per-customer booking statistics.
+"""
+from typing import Optional, List, Dict, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, func, case, select, Row
+
+from ...models import Booking, BookingStatus, Customer
+from ..bookings.search import escape_like
+
+# Bookings that never produced revenue
+LOST_STATUSES = (BookingStatus.cancelled, BookingStatus.no_show)
+
+SORT_FIELDS = ("name", "booking_count", "total_spend", "last_booking_at", "created_at")
+
+
+class CustomerService:
+    """Service for customer directory queries."""
+
+    @staticmethod
+    def _booking_stats_subquery():
+        """Per-customer booking aggregates computed with one GROUP BY over bookings."""
+        return (
+            select(
+                Booking.customer_id.label("customer_id"),
+                func.count(Booking.id).label("booking_count"),
+                func.sum(
+                    case((Booking.status.in_(LOST_STATUSES), 0), else_=Booking.cost)
+                ).label("total_spend"),
+                func.max(Booking.created_at).label("last_booking_at"),
+                func.sum(
+                    case((Booking.status == BookingStatus.cancelled, 1), else_=0)
+                ).label("cancelled_count"),
+                func.sum(
+                    case((Booking.status == BookingStatus.no_show, 1), else_=0)
+                ).label("no_show_count"),
+            )
+            .group_by(Booking.customer_id)
+            .subquery("booking_stats")
+        )
+
+    @staticmethod
+    def get_directory(
+        db: Session,
+        search: Optional[str] = None,
+        customer_filter: str = "all",
+        sort_by: str = "last_booking_at",
+        descending: bool = True,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List[Row], Dict[str, int]]:
+        """
+        Get a page of customers with aggregated booking statistics.
+        
+        Args:
+            db: Database session
+            search: Search in customer name, email or phone
+            customer_filter: "all", "repeat" (more than one booking) or
+                "cancelled" (at least one cancelled or no-show booking)
+            sort_by: One of SORT_FIELDS
+            descending: Sort direction
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+        
+        Returns:
+            (rows, summary) where summary holds the total, repeat and
+            cancelled/no-show customer counts for the current search/filter
+        
+        Raises:
+            ValueError: If sort_by or customer_filter is not supported
+        """
+        stats = CustomerService._booking_stats_subquery()
+        booking_count = func.coalesce(stats.c.booking_count, 0)
+        total_spend = func.coalesce(stats.c.total_spend, 0)
+        cancelled_count = func.coalesce(stats.c.cancelled_count, 0)
+        no_show_count = func.coalesce(stats.c.no_show_count, 0)
+
+        sort_columns = {
+            "name": Customer.full_name,
+            "booking_count": booking_count,
+            "total_spend": total_spend,
+            "last_booking_at": stats.c.last_booking_at,
+            "created_at": Customer.created_at,
+        }
+        if sort_by not in sort_columns:
+            raise ValueError(f"Invalid sort field: {sort_by}")
+
+        conditions = []
+        if search:
+            pattern = f"%{escape_like(search.lower())}%"
+            conditions.append(
+                or_(
+                    Customer.full_name.ilike(pattern, escape="\\"),
+                    Customer.email.ilike(pattern, escape="\\"),
+                    Customer.whatsapp_number.ilike(pattern, escape="\\"),
+                )
+            )
+
+        if customer_filter == "repeat":
+            conditions.append(booking_count > 1)
+        elif customer_filter == "cancelled":
+            conditions.append(cancelled_count + no_show_count > 0)
+        elif customer_filter != "all":
+            raise ValueError(f"Invalid customer filter: {customer_filter}")
+
+        base = (
+            select(
+                Customer.id,
+                Customer.full_name,
+                Customer.email,
+                Customer.whatsapp_number,
+                Customer.created_at,
+                booking_count.label("booking_count"),
+                total_spend.label("total_spend"),
+                stats.c.last_booking_at,
+                cancelled_count.label("cancelled_count"),
+                no_show_count.label("no_show_count"),
+            )
+            .outerjoin(stats, stats.c.customer_id == Customer.id)
+            .where(*conditions)
+        )
+
+        sort_column = sort_columns[sort_by]
+        ordering = sort_column.desc() if descending else sort_column.asc()
+        rows = db.execute(
+            base.order_by(ordering.nulls_last(), Customer.id.asc()).offset(skip).limit(limit)
+        ).all()
+
+        matched = base.subquery("matched")
+        summary_row = db.execute(
+            select(
+                func.count().label("total"),
+                func.coalesce(func.sum(case((matched.c.booking_count > 1, 1), else_=0)), 0).label("repeat"),
+                func.coalesce(
+                    func.sum(case((matched.c.cancelled_count + matched.c.no_show_count > 0, 1), else_=0)), 0
+                ).label("cancelled_or_no_show"),
+            )
+        ).one()
+        summary = {key: int(value) for key, value in summary_row._mapping.items()}
+
+        return rows, summary
@@ -0,0 +1 @@
+# Occupancy services package
@@ -0,0 +1,162 @@
+"""
+Capacity forecast: expected cars on site per hour for the coming days.
+
+Future BOOKED bookings are weighted by the historical show rate of their
+flight type (1 - cancellation/no-show rate); cars already on site count in
+full until their pickup time. Intervals are histogrammed into hourly bins
+with a weighted difference array, so the cost is O(bookings + hours).
+Hours are on local wall-clock time (settings.TIMEZONE), the clock of
+dropoff_at and pickup_at.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict
+
+import numpy as np
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...models import Booking, BookingStatus, FlightType
+from ..bookings.booking_service import BookingService
+from ..bookings.timezones import local_now
+from .timeline import to_epoch_seconds, epoch_seconds
+
+HOUR = 3600
+
+# Outcomes that tell whether a booking showed up
+SHOWED_STATUSES = (BookingStatus.on_site, BookingStatus.overstay, BookingStatus.collected)
+MISSED_STATUSES = (BookingStatus.cancelled, BookingStatus.no_show)
+
+_cache_lock = threading.Lock()
+_cache: Dict[int, dict] = {}
+
+
+def interval_histogram(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    weights: np.ndarray,
+    origin: int,
+    bin_seconds: int,
+    bin_count: int,
+) -> np.ndarray:
+    """
+    Sum of weights of intervals overlapping each bin.
+
+    Bin i covers [origin + i * bin_seconds, origin + (i + 1) * bin_seconds).
+    Each interval adds its weight at its first bin and removes it after its
+    last, and a cumulative sum turns those deltas into per-bin totals.
+    """
+    first = np.clip((starts - origin) // bin_seconds, 0, bin_count)
+    # Ceiling division: a partial final hour still counts
+    last = np.clip(-((origin - ends) // bin_seconds), 0, bin_count)
+    keep = last > first
+    deltas = (
+        np.bincount(first[keep], weights[keep], minlength=bin_count + 1)
+        - np.bincount(last[keep], weights[keep], minlength=bin_count + 1)
+    )
+    return np.cumsum(deltas)[:bin_count]
+
+
+class CapacityForecastService:
+    """Service producing cached hourly occupancy forecasts."""
+
+    @staticmethod
+    def get_show_rates(db: Session, since: datetime) -> Dict[FlightType, float]:
+        """
+        Share of resolved bookings per flight type that showed up, for
+        bookings with drop-off after since. Defaults to 1.0 without history.
+        """
+        rows = db.execute(
+            select(
+                Booking.flight_type,
+                func.sum(case((Booking.status.in_(SHOWED_STATUSES), 1), else_=0)),
+                func.sum(case((Booking.status.in_(MISSED_STATUSES), 1), else_=0)),
+            )
+            .where(Booking.dropoff_at >= since)
+            .group_by(Booking.flight_type)
+        ).all()
+
+        rates = {flight_type: 1.0 for flight_type in FlightType}
+        for flight_type, showed, missed in rows:
+            resolved = (showed or 0) + (missed or 0)
+            if resolved:
+                rates[FlightType(flight_type)] = (showed or 0) / resolved
+        return rates
+
+    @staticmethod
+    def build_forecast(db: Session, days: int, now: Optional[datetime] = None) -> dict:
+        """
+        Compute the hourly forecast for the next `days` days starting at the
+        current local hour; now is naive local time (default: local_now()).
+        """
+        now = now or local_now()
+        origin_dt = now.replace(minute=0, second=0, microsecond=0)
+        origin = epoch_seconds(origin_dt)
+        bin_count = days * 24
+        horizon = origin_dt + timedelta(days=days)
+
+        show_rates = CapacityForecastService.get_show_rates(
+            db, now - timedelta(days=settings.FORECAST_HISTORY_DAYS)
+        )
+
+        rows = db.execute(
+            select(Booking.status, Booking.flight_type, Booking.dropoff_at, Booking.pickup_at)
+            .where(
+                Booking.status.in_([BookingStatus.booked, BookingStatus.on_site, BookingStatus.overstay]),
+                Booking.dropoff_at < horizon,
+            )
+        ).all()
+
+        expected = np.zeros(bin_count)
+        booked = np.zeros(bin_count)
+        if rows:
+            status_col, flight_col, dropoff_col, pickup_col = zip(*rows)
+            is_booked = np.array([BookingStatus(value) == BookingStatus.booked for value in status_col])
+            rate_by_type = np.array([show_rates[FlightType(value)] for value in flight_col])
+
+            starts = np.maximum(to_epoch_seconds(dropoff_col), origin)
+            ends = to_epoch_seconds(pickup_col)
+            # Cars already on site stay at least through the current hour
+            ends = np.where(is_booked, ends, np.maximum(ends, origin + HOUR))
+            # Late BOOKED arrivals whose pickup passed are not expected any more
+            starts = np.where(is_booked & (ends <= origin), ends, starts)
+
+            weights = np.where(is_booked, rate_by_type, 1.0)
+            expected = interval_histogram(starts, ends, weights, origin, HOUR, bin_count)
+            booked = interval_histogram(starts, ends, np.ones(len(rows)), origin, HOUR, bin_count)
+
+        peak_index = int(np.argmax(expected)) if bin_count else 0
+        return {
+            "start": origin_dt,
+            "days": days,
+            "expected": np.round(expected, 2).tolist(),
+            "booked": booked.astype(np.int64).tolist(),
+            "peak_at": origin_dt + timedelta(hours=peak_index),
+            "peak_expected": round(float(expected[peak_index]), 2) if bin_count else 0.0,
+            "show_rates": {flight_type.value: round(rate, 4) for flight_type, rate in show_rates.items()},
+        }
+
+    @staticmethod
+    def get_forecast(db: Session, days: int) -> dict:
+        """
+        Get the cached forecast, recomputed when bookings change or the
+        current hour rolls over.
+        """
+        version = BookingService.get_data_version(db)
+        current_hour = local_now().replace(minute=0, second=0, microsecond=0)
+        with _cache_lock:
+            cached = _cache.get(days)
+            if (
+                cached is not None
+                and cached["version"] == version
+                and cached["forecast"]["start"] == current_hour
+                and time.monotonic() - cached["built_at"] < settings.FORECAST_CACHE_SECONDS
+            ):
+                return cached["forecast"]
+
+        forecast = CapacityForecastService.build_forecast(db, days)
+        with _cache_lock:
+            _cache[days] = {"forecast": forecast, "version": version, "built_at": time.monotonic()}
+        return forecast
@@ -0,0 +1,222 @@
+"""
+Occupancy service: how many cars are on site at a time, and daily peaks.
+
+The timeline runs on local wall-clock time (settings.TIMEZONE), the clock of
+dropoff_at and pickup_at; checked_in_at and collected_at are stored as UTC
+and converted (vectorised) before the intervals are built.
+
+Each booking's stay is cached as NumPy columns that are refreshed from the
+bookings updated since the previous query, so queries do not rescan the
+table; each query then sweeps only the intervals overlapping its window.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...models import Booking, BookingStatus
+from ..bookings.booking_service import BookingService
+from ..bookings.timezones import get_zone, local_day_bounds_utc, local_now, utc_to_local
+from .timeline import OccupancyTimeline, OPEN_END, epoch_seconds
+
+DAY = 86400
+
+# Bookings whose car never came to the site
+EXCLUDED_STATUSES = (BookingStatus.cancelled, BookingStatus.no_show)
+ON_SITE_STATUSES = (BookingStatus.on_site, BookingStatus.overstay)
+
+INTERVAL_COLUMNS = ("ids", "status", "dropoff", "pickup", "arrived", "left")
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, object] = {}
+
+
+def local_offsets(seconds: np.ndarray) -> np.ndarray:
+    """
+    UTC offset of settings.TIMEZONE, in seconds, at each UTC epoch second.
+
+    The zone is looked up once per distinct day; only values on days with
+    an offset change (DST transitions) are looked up one by one.
+    """
+    zone = get_zone()
+
+    def offset(at: int) -> int:
+        return int(datetime.fromtimestamp(at, zone).utcoffset().total_seconds())
+
+    days, inverse = np.unique(seconds // DAY, return_inverse=True)
+    first = np.array([offset(int(day) * DAY) for day in days], dtype=np.int64)
+    last = np.array([offset(int(day) * DAY + DAY - 1) for day in days], dtype=np.int64)
+    offsets = first[inverse]
+    changing = (first != last)[inverse]
+    if changing.any():
+        offsets[changing] = [offset(int(value)) for value in seconds[changing]]
+    return offsets
+
+
+def _local_array(values) -> np.ndarray:
+    """Naive UTC datetimes (or None) as local wall-clock datetime64 values."""
+    utc = np.array(values, dtype="datetime64[s]")
+    known = ~np.isnat(utc)
+    if known.any():
+        seconds = utc[known].astype(np.int64)
+        utc[known] = (seconds + local_offsets(seconds)).astype("datetime64[s]")
+    return utc
+
+
+def _empty_intervals() -> Dict[str, np.ndarray]:
+    return {
+        "ids": np.zeros(0, dtype=np.int64),
+        "status": np.zeros(0, dtype=str),
+        **{column: np.zeros(0, dtype=np.int64) for column in ("dropoff", "pickup", "arrived", "left")},
+    }
+
+
+class OccupancyService:
+    """Service answering occupancy queries from cached booking intervals."""
+
+    @staticmethod
+    def load_intervals(db: Session, updated_since: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """
+        Read the stay of each booking as local epoch seconds:
+
+        - arrived: check-in (or drop-off when not checked in)
+        - left: collection (or pickup when not collected)
+
+        Args:
+            db: Database session
+            updated_since: Only bookings updated after this naive UTC time,
+                including cancelled and no-show ones so they can be dropped
+
+        Returns:
+            Column arrays keyed by INTERVAL_COLUMNS
+        """
+        query = select(
+            Booking.id,
+            Booking.status,
+            Booking.dropoff_at,
+            Booking.pickup_at,
+            Booking.checked_in_at,
+            Booking.collected_at,
+        )
+        if updated_since is None:
+            query = query.where(Booking.status.not_in(EXCLUDED_STATUSES))
+        else:
+            query = query.where(Booking.updated_at > updated_since)
+        rows = db.execute(query).all()
+        if not rows:
+            return _empty_intervals()
+
+        id_col, status_col, dropoff_col, pickup_col, checked_in_col, collected_col = zip(*rows)
+        dropoff = np.array(dropoff_col, dtype="datetime64[s]")
+        pickup = np.array(pickup_col, dtype="datetime64[s]")
+        checked_in = _local_array(checked_in_col)
+        collected = _local_array(collected_col)
+        return {
+            "ids": np.array(id_col, dtype=np.int64),
+            "status": np.array([BookingStatus(value).value for value in status_col]),
+            "dropoff": dropoff.astype(np.int64),
+            "pickup": pickup.astype(np.int64),
+            "arrived": np.where(np.isnat(checked_in), dropoff, checked_in).astype(np.int64),
+            "left": np.where(np.isnat(collected), pickup, collected).astype(np.int64),
+        }
+
+    @staticmethod
+    def get_intervals(db: Session) -> Dict[str, np.ndarray]:
+        """
+        Get the cached booking intervals, brought up to date incrementally.
+
+        Each call re-reads only bookings updated since the previous one
+        (overlapping by BOOKINGS_SYNC_LAG_SECONDS, like the change feed) and
+        drops deleted ones; everything is reloaded every
+        OCCUPANCY_CACHE_SECONDS in case a long transaction committed rows
+        older than the overlap.
+        """
+        with _cache_lock:
+            started = datetime.utcnow()
+            intervals = _cache.get("intervals")
+            if intervals is None or time.monotonic() - _cache["loaded_at"] >= settings.OCCUPANCY_CACHE_SECONDS:
+                intervals = OccupancyService.load_intervals(db)
+                _cache.update(intervals=intervals, synced_at=started, loaded_at=time.monotonic())
+                return intervals
+
+            since = _cache["synced_at"] - timedelta(seconds=settings.BOOKINGS_SYNC_LAG_SECONDS)
+            changed = OccupancyService.load_intervals(db, updated_since=since)
+            deleted = BookingService.get_deleted_since(db, since)
+            if len(changed["ids"]) or deleted:
+                stale = np.isin(intervals["ids"], np.concatenate([changed["ids"], np.array(deleted, dtype=np.int64)]))
+                counted = ~np.isin(changed["status"], [s.value for s in EXCLUDED_STATUSES])
+                intervals = {
+                    column: np.concatenate([intervals[column][~stale], changed[column][counted]])
+                    for column in INTERVAL_COLUMNS
+                }
+            _cache.update(intervals=intervals, synced_at=started)
+            return intervals
+
+    @staticmethod
+    def build_timeline(
+        intervals: Dict[str, np.ndarray],
+        window_start: int,
+        window_end: int,
+        now: Optional[datetime] = None,
+    ) -> OccupancyTimeline:
+        """
+        Build the timeline over [window_start, window_end) (local epoch
+        seconds) from the intervals overlapping it, respecting status:
+
+        - COLLECTED: from check-in (or drop-off) to collection (or pickup)
+        - ON_SITE / OVERSTAY: from check-in (or drop-off), still open
+        - BOOKED: expected from drop-off until pickup, if drop-off is still
+          ahead; late arrivals count once they are checked in
+        - CANCELLED / NO_SHOW: not loaded
+
+        Args:
+            intervals: Booking intervals from get_intervals
+            window_start: Start of the queried window
+            window_end: End of the queried window
+            now: Current naive local time (default: now in settings.TIMEZONE)
+        """
+        now = now or local_now()
+        status = intervals["status"]
+        dropoff = intervals["dropoff"]
+        is_booked = status == BookingStatus.booked.value
+        is_on_site = np.isin(status, [s.value for s in ON_SITE_STATUSES])
+        # Empty interval (end == start) for bookings whose drop-off has passed
+        expected_end = np.where(dropoff >= epoch_seconds(now), intervals["pickup"], dropoff)
+
+        starts = np.where(is_booked, dropoff, intervals["arrived"])
+        ends = np.where(is_on_site, OPEN_END, np.where(is_booked, expected_end, intervals["left"]))
+        overlapping = (starts < window_end) & (ends > window_start)
+        return OccupancyTimeline(starts[overlapping], ends[overlapping])
+
+    @staticmethod
+    def get_occupancy_at(db: Session, at: datetime) -> int:
+        """Number of cars on site at a naive UTC time."""
+        point = epoch_seconds(utc_to_local(at))
+        timeline = OccupancyService.build_timeline(OccupancyService.get_intervals(db), point, point + 1)
+        return int(timeline.at(point))
+
+    @staticmethod
+    def get_daily_peaks(db: Session, start: date, end: date, tz_name: Optional[str] = None) -> List[dict]:
+        """
+        Peak and start-of-day occupancy for each local date in [start, end].
+        Days in tz_name are mapped onto the timeline's settings.TIMEZONE clock.
+        """
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        day_starts = [local_day_bounds_utc(day, tz_name)[0] for day in days]
+        day_starts.append(local_day_bounds_utc(end, tz_name)[1])
+        boundaries = [epoch_seconds(utc_to_local(value)) for value in day_starts]
+
+        timeline = OccupancyService.build_timeline(
+            OccupancyService.get_intervals(db), boundaries[0], boundaries[-1]
+        )
+        peaks = timeline.peaks(boundaries)
+        opening = timeline.at(boundaries[:-1])
+        return [
+            {"date": day, "peak": int(peak), "start_of_day": int(level)}
+            for day, peak, level in zip(days, peaks, opening)
+        ]
@@ -0,0 +1,80 @@
+"""
+Occupancy timeline over parking intervals.
+
+Intervals are half-open [start, end) in integer seconds since the epoch (UTC).
+The timeline merges all interval boundaries into one sorted event array and
+keeps the running occupancy level after each event (a prefix sum of +1/-1
+deltas), so point queries are a binary search and range peaks are a segmented
+max over the level array.
+"""
+from datetime import datetime, timezone
+from typing import Sequence
+
+import numpy as np
+
+# End value for intervals that are still open (car on site, not yet collected)
+OPEN_END = np.iinfo(np.int64).max
+
+
+def to_epoch_seconds(values: Sequence[datetime]) -> np.ndarray:
+    """Convert naive UTC datetimes to int64 epoch seconds."""
+    return np.array(values, dtype="datetime64[s]").astype(np.int64)
+
+
+def epoch_seconds(value: datetime) -> int:
+    """Convert one naive UTC datetime to epoch seconds."""
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+
+class OccupancyTimeline:
+    """Sorted event array with occupancy levels for fast point and range queries."""
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        valid = ends > starts
+        starts, ends = starts[valid], ends[valid]
+
+        times = np.concatenate([starts, ends])
+        deltas = np.concatenate([
+            np.ones(len(starts), dtype=np.int64),
+            -np.ones(len(ends), dtype=np.int64),
+        ])
+        order = np.argsort(times, kind="stable")
+        times, deltas = times[order], deltas[order]
+
+        # Collapse events at the same instant so each time has one level
+        self.times, first_index = np.unique(times, return_index=True)
+        if len(times):
+            self.levels = np.add.reduceat(deltas, first_index).cumsum()
+        else:
+            self.levels = np.zeros(0, dtype=np.int64)
+        # Level before the first event is 0; index 0 of the padded array
+        self._padded_levels = np.concatenate([np.zeros(1, dtype=np.int64), self.levels])
+        self.interval_count = int(len(starts))
+
+    def at(self, points) -> np.ndarray:
+        """Occupancy at each point (epoch seconds); scalars are accepted."""
+        points = np.asarray(points, dtype=np.int64)
+        return self._padded_levels[np.searchsorted(self.times, points, side="right")]
+
+    def peaks(self, boundaries) -> np.ndarray:
+        """
+        Peak occupancy within each window [boundaries[i], boundaries[i + 1]).
+        Boundaries must be sorted. Returns len(boundaries) - 1 values.
+        """
+        boundaries = np.asarray(boundaries, dtype=np.int64)
+        if len(boundaries) < 2:
+            return np.zeros(0, dtype=np.int64)
+
+        # Level at each window start, raised by any event inside the window
+        result = self.at(boundaries[:-1])
+        bounds = np.searchsorted(self.times, boundaries, side="left")
+        starts, stops = bounds[:-1], bounds[1:]
+        non_empty = stops > starts
+        if non_empty.any():
+            # Windows are consecutive, so each non-empty segment ends where the
+            # next one begins; truncating the levels ends the last one in time.
+            segment_max = np.maximum.reduceat(self.levels[:bounds[-1]], starts[non_empty])
+            result[non_empty] = np.maximum(result[non_empty], segment_max)
+        return result
@@ -0,0 +1,191 @@
+"""
+Incrementally maintained daily revenue rollup.
+
+Each booking contributes (1 booking, cost) to the daily_revenue row keyed by
+its local creation date, flight type and payment method, unless it was
+cancelled or a no-show. Writers take a snapshot of the booking before and
+after a change and record the difference, so reports never aggregate the
+bookings table.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Optional, Dict, Tuple, Iterable, NamedTuple
+
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+
+from ...models import Booking, BookingStatus, DailyRevenue, FlightType, PaymentMethod
+from ..bookings.timezones import local_date
+
+# Bookings that never produced revenue
+EXCLUDED_STATUSES = (BookingStatus.cancelled, BookingStatus.no_show)
+
+RollupKey = Tuple[date, FlightType, PaymentMethod]
+
+
+class RevenueContribution(NamedTuple):
+    """What a booking adds to the rollup."""
+    key: RollupKey
+    cost: Decimal
+
+
+class RevenueRollupService:
+    """Service maintaining and reading the daily_revenue rollup."""
+
+    @staticmethod
+    def contribution(booking: Booking) -> Optional[RevenueContribution]:
+        """
+        Snapshot a booking's contribution to the rollup, or None if it does
+        not count towards revenue.
+
+        Attributes may hold raw strings right after a BookingUpdate is applied,
+        so enum values are coerced here.
+        """
+        if booking.created_at is None or booking.status is None:
+            return None
+        if BookingStatus(booking.status) in EXCLUDED_STATUSES:
+            return None
+        key = (
+            local_date(booking.created_at),
+            FlightType(booking.flight_type),
+            PaymentMethod(booking.payment_method or PaymentMethod.cash),
+        )
+        return RevenueContribution(key, Decimal(str(booking.cost or 0)))
+
+    @staticmethod
+    def record_change(
+        db: Session,
+        before: Optional[RevenueContribution],
+        after: Optional[RevenueContribution],
+    ) -> None:
+        """
+        Apply the difference between two snapshots of the same booking.
+
+        Pass before=None for a new booking and after=None for a deleted one.
+        Runs inside the caller's transaction.
+        """
+        deltas = RevenueRollupService.new_deltas()
+        RevenueRollupService.add_delta(deltas, before, after)
+        RevenueRollupService.apply_deltas(db, deltas)
+
+    @staticmethod
+    def new_deltas() -> Dict[RollupKey, list]:
+        """Accumulator for batching many changes into one apply_deltas call."""
+        return defaultdict(lambda: [0, Decimal("0")])
+
+    @staticmethod
+    def add_delta(
+        deltas: Dict[RollupKey, list],
+        before: Optional[RevenueContribution],
+        after: Optional[RevenueContribution],
+    ) -> None:
+        """Accumulate the difference between two snapshots into deltas."""
+        if before == after:
+            return
+        if before is not None:
+            deltas[before.key][0] -= 1
+            deltas[before.key][1] -= before.cost
+        if after is not None:
+            deltas[after.key][0] += 1
+            deltas[after.key][1] += after.cost
+
+    @staticmethod
+    def apply_deltas(db: Session, deltas: Dict[RollupKey, list]) -> None:
+        """Add accumulated (count, revenue) deltas to the rollup with one upsert."""
+        rows = [
+            {
+                "day": key[0],
+                "flight_type": key[1],
+                "payment_method": key[2],
+                "booking_count": count,
+                "revenue": revenue,
+            }
+            for key, (count, revenue) in deltas.items()
+            if count or revenue
+        ]
+        if not rows:
+            return
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            RevenueRollupService._apply_deltas_orm(db, rows)
+            return
+
+        table = DailyRevenue.__table__
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.flight_type, table.c.payment_method],
+            set_={
+                "booking_count": table.c.booking_count + stmt.excluded.booking_count,
+                "revenue": table.c.revenue + stmt.excluded.revenue,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def _apply_deltas_orm(db: Session, rows: list) -> None:
+        """Read-modify-write fallback for databases without ON CONFLICT support."""
+        for row in rows:
+            existing = (
+                db.query(DailyRevenue)
+                .filter(
+                    DailyRevenue.day == row["day"],
+                    DailyRevenue.flight_type == row["flight_type"],
+                    DailyRevenue.payment_method == row["payment_method"],
+                )
+                .with_for_update()
+                .first()
+            )
+            if existing:
+                existing.booking_count += row["booking_count"]
+                existing.revenue = Decimal(str(existing.revenue)) + row["revenue"]
+            else:
+                db.add(DailyRevenue(**row))
+        db.flush()
+
+    @staticmethod
+    def rebuild(db: Session, chunk_size: int = 5000) -> int:
+        """
+        Recompute the rollup from scratch from the bookings table.
+
+        Returns the number of rollup rows written. Commits on success.
+        """
+        deltas = RevenueRollupService.new_deltas()
+        rows = db.execute(
+            select(
+                Booking.created_at,
+                Booking.status,
+                Booking.flight_type,
+                Booking.payment_method,
+                Booking.cost,
+            ).execution_options(yield_per=chunk_size)
+        )
+        for row in rows:
+            RevenueRollupService.add_delta(deltas, None, RevenueRollupService.contribution(row))
+
+        db.execute(delete(DailyRevenue))
+        RevenueRollupService.apply_deltas(db, deltas)
+        db.commit()
+        return sum(1 for count, revenue in deltas.values() if count or revenue)
+
+    @staticmethod
+    def get_daily(
+        db: Session,
+        start: date,
+        end: date,
+        flight_type: Optional[FlightType] = None,
+        payment_method: Optional[PaymentMethod] = None,
+    ) -> Iterable[DailyRevenue]:
+        """Get rollup rows for local dates in [start, end], ordered by day."""
+        query = db.query(DailyRevenue).filter(DailyRevenue.day >= start, DailyRevenue.day <= end)
+        if flight_type:
+            query = query.filter(DailyRevenue.flight_type == flight_type)
+        if payment_method:
+            query = query.filter(DailyRevenue.payment_method == payment_method)
+        return query.order_by(DailyRevenue.day.asc()).all()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark CSV import date parsing on synthetic rows.
+
+Times the Timestamp, Departure Date and Arrival Date columns of a generated
+file with the previous per-value strptime chain, and again with the formats
+detected once per file by CSVImporter (pre-compiled patterns plus the date
+cache). Runs once with DD/MM/YYYY dates and once with M/D/YYYY dates, and
+reports how many values the two parsers read differently; with M/D/YYYY
+dates these are the ambiguous ones the strptime chain read as DD/MM.
+
+Importing the importer loads the application settings, so the backend
+environment must be available (backend/.env or environment variables; see
+benchmarks/partial_indexes.py). No database is used.
+
+Usage:
+    # From backend directory:
+    python -m benchmarks.csv_dates --rows 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path to allow imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.csv_dates import DATE_FORMATS
+from app.services.csv_importer import CSVImporter
+
+DATE_LAYOUTS = {
+    "DD/MM/YYYY": lambda d: f"{d.day:02d}/{d.month:02d}/{d.year}",
+    "M/D/YYYY": lambda d: f"{d.month}/{d.day}/{d.year}",
+}
+
+
+def legacy_parse_date(date_str: str):
+    """parse_date before format detection: up to three strptime calls per value."""
+    if not date_str or date_str.strip() == "":
+        return None
+    date_str = date_str.strip()
+    for pattern in ("%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(date_str, pattern).date()
+        except ValueError:
+            pass
+    return None
+
+
+def legacy_parse_timestamp(timestamp_str: str):
+    """parse_timestamp before format detection."""
+    if not timestamp_str or timestamp_str.strip() == "":
+        return None
+    timestamp_str = timestamp_str.strip()
+    for pattern in ("%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S"):
+        try:
+            return datetime.strptime(timestamp_str, pattern)
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(timestamp_str.replace(" ", "T"))
+    except ValueError:
+        return None
+
+
+def generate_rows(count: int, layout: str, seed: int = 42) -> list:
+    """Rows with form-style timestamps and bookings over roughly two years."""
+    rng = random.Random(seed)
+    format_date = DATE_LAYOUTS[layout]
+    start = datetime(2024, 1, 1)
+    rows = []
+    for _ in range(count):
+        created = start + timedelta(seconds=rng.randint(0, 730 * 86400))
+        departure = created + timedelta(days=rng.randint(0, 60))
+        arrival = departure + timedelta(days=rng.randint(1, 21))
+        rows.append({
+            "Timestamp": f"{created.month}/{created.day}/{created.year} {created.hour}:{created.minute:02d}:{created.second:02d}",
+            "Departure Date": format_date(departure),
+            "Arrival Date": format_date(arrival),
+        })
+    return rows
+
+
+def parse_legacy(rows: list) -> list:
+    return [
+        (
+            legacy_parse_timestamp(row["Timestamp"]),
+            legacy_parse_date(row["Departure Date"]),
+            legacy_parse_date(row["Arrival Date"]),
+        )
+        for row in rows
+    ]
+
+
+def parse_detected(rows: list, sample_rows: int) -> list:
+    # Start each run with a cold date cache
+    for fmt in DATE_FORMATS:
+        fmt.parse_date.cache_clear()
+    importer = CSVImporter(None)
+    importer.detect_column_formats(rows[:sample_rows])
+    formats = importer.column_formats
+    return [
+        (
+            importer.parse_timestamp(row["Timestamp"], formats.get("Timestamp")),
+            importer.parse_date(row["Departure Date"], formats.get("Departure Date")),
+            importer.parse_date(row["Arrival Date"], formats.get("Arrival Date")),
+        )
+        for row in rows
+    ]
+
+
+def time_parser(parse, repeat: int) -> tuple:
+    """Median wall time in milliseconds over repeat runs, and the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = parse()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    """Main entry point for the date parsing benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Number of synthetic rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser")
+    parser.add_argument("--sample-rows", type=int, default=500, help="Rows sampled for format detection")
+    args = parser.parse_args()
+
+    print(f"Parsing 3 date columns of {args.rows} rows (median of {args.repeat} runs)")
+    for layout in DATE_LAYOUTS:
+        rows = generate_rows(args.rows, layout)
+        before, legacy = time_parser(lambda: parse_legacy(rows), args.repeat)
+        after, detected = time_parser(lambda: parse_detected(rows, args.sample_rows), args.repeat)
+        differ = sum(
+            1 for old, new in zip(legacy, detected) for a, b in zip(old, new) if a != b
+        )
+        speedup = before / after if after else float("inf")
+        print(f"\n== dates as {layout} ==")
+        print(f"  strptime chain       {before:10.1f} ms")
+        print(f"  detected + cached    {after:10.1f} ms  ({speedup:.1f}x)")
+        print(f"  values read differently: {differ}")
+
+
+if __name__ == "__main__":
+    main()
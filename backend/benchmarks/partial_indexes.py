@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Benchmark the partial booking status indexes on a synthetic dataset.
+
+Builds a separate database with a realistic status mix (mostly COLLECTED),
+then times the operational queries and prints their plans with only the
+plain ix_booking_status index, and again with the partial indexes declared
+in app.models.
+
+Importing the models loads the application settings, so the backend
+environment must be available (backend/.env or environment variables):
+DATABASE_URL, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+BREVO_API_KEY, OPENAI_API_KEY and ELEVENLABS_API_KEY. DATABASE_URL is never
+connected to; the benchmark builds its own engine from --url.
+
+Usage:
+    # From backend directory (never point --url at the application database):
+    python -m benchmarks.partial_indexes --rows 200000
+    python -m benchmarks.partial_indexes --url postgresql://localhost/crm_bench
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path to allow imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, insert, select, text
+
+from app.db import Base
+from app.models import Booking, BookingStatus, Customer, Vehicle, FlightType, PaymentMethod
+
+PARTIAL_INDEXES = [
+    index for index in Booking.__table__.indexes
+    if index.dialect_options["postgresql"]["where"] is not None
+]
+
+STATUS_MIX = [
+    (BookingStatus.collected, 0.94),
+    (BookingStatus.cancelled, 0.02),
+    (BookingStatus.no_show, 0.01),
+    (BookingStatus.booked, 0.02),
+    (BookingStatus.on_site, 0.007),
+    (BookingStatus.overstay, 0.003),
+]
+
+
+def benchmark_queries(now: datetime) -> dict:
+    """Operational queries that filter on a few statuses."""
+    return {
+        "cars on site (get_on_site)": (
+            select(Booking.id)
+            .where(Booking.status.in_([BookingStatus.on_site, BookingStatus.overstay]))
+            .order_by(Booking.checked_in_at.asc())
+        ),
+        "overstays (get_overstays)": (
+            select(Booking.id)
+            .where(Booking.status == BookingStatus.overstay)
+            .order_by(Booking.pickup_at.asc())
+        ),
+        "overdue on site (overstay sweep)": (
+            select(Booking.id)
+            .where(Booking.status == BookingStatus.on_site, Booking.pickup_at < now)
+        ),
+        "drop-offs next 24h": (
+            select(Booking.id)
+            .where(
+                Booking.status == BookingStatus.booked,
+                Booking.dropoff_at >= now,
+                Booking.dropoff_at < now + timedelta(days=1),
+            )
+        ),
+        "active bookings this week": (
+            select(Booking.id)
+            .where(
+                Booking.status.in_([BookingStatus.booked, BookingStatus.on_site, BookingStatus.overstay]),
+                Booking.dropoff_at >= now - timedelta(days=7),
+            )
+        ),
+    }
+
+
+def populate(engine, rows: int, now: datetime, seed: int = 42) -> None:
+    """Create the schema and insert synthetic customers, vehicles and bookings."""
+    rng = random.Random(seed)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    owners = max(1, rows // 5)
+    statuses = [status for status, _ in STATUS_MIX]
+    weights = [weight for _, weight in STATUS_MIX]
+
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [
+            {"full_name": f"Customer {i}", "email": f"customer{i}@example.com", "whatsapp_number": f"+2770{i:07d}"}
+            for i in range(owners)
+        ])
+        conn.execute(insert(Vehicle), [
+            {"registration": f"BENCH{i:07d}", "make_model": "Toyota Corolla", "color": "White"}
+            for i in range(owners)
+        ])
+
+    batch = []
+    for i in range(rows):
+        status = rng.choices(statuses, weights)[0]
+        if status == BookingStatus.booked:
+            dropoff = now + timedelta(hours=rng.uniform(0, 24 * 60))
+        elif status in (BookingStatus.on_site, BookingStatus.overstay):
+            dropoff = now - timedelta(hours=rng.uniform(1, 24 * 14))
+        else:
+            dropoff = now - timedelta(hours=rng.uniform(24, 24 * 365 * 3))
+        pickup = dropoff + timedelta(hours=rng.uniform(6, 24 * 10))
+        if status == BookingStatus.overstay:
+            pickup = min(pickup, now - timedelta(hours=1))
+        batch.append({
+            "source": "benchmark",
+            "source_row_id": f"row_{i}",
+            "customer_id": rng.randint(1, owners),
+            "vehicle_id": rng.randint(1, owners),
+            "flight_type": rng.choice(list(FlightType)),
+            "dropoff_at": dropoff,
+            "pickup_at": pickup,
+            "payment_method": rng.choice(list(PaymentMethod)),
+            "cost": round(rng.uniform(150, 2500), 2),
+            "status": status,
+            "checked_in_at": dropoff if status in (BookingStatus.on_site, BookingStatus.overstay, BookingStatus.collected) else None,
+            "collected_at": pickup if status == BookingStatus.collected else None,
+            "created_at": dropoff - timedelta(days=rng.uniform(0, 30)),
+            "updated_at": now,
+        })
+        if len(batch) == 10000:
+            with engine.begin() as conn:
+                conn.execute(insert(Booking), batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(Booking), batch)
+
+
+def analyze(engine) -> None:
+    """Refresh planner statistics."""
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def explain(engine, stmt) -> str:
+    """Return the query plan for a statement."""
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    else:
+        prefix = "EXPLAIN QUERY PLAN "
+    with engine.connect() as conn:
+        rows = conn.execute(text(prefix + sql)).all()
+    return "\n".join("    " + " ".join(str(col) for col in row) for row in rows)
+
+
+def time_query(engine, stmt, repeat: int) -> float:
+    """Median wall time in milliseconds over repeat runs."""
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(stmt).all()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_phase(engine, label: str, queries: dict, repeat: int, show_plans: bool) -> dict:
+    analyze(engine)
+    print(f"\n== {label} ==")
+    results = {}
+    for name, stmt in queries.items():
+        results[name] = time_query(engine, stmt, repeat)
+        print(f"  {name:<36} {results[name]:8.2f} ms")
+        if show_plans:
+            print(explain(engine, stmt))
+    return results
+
+
+def main():
+    """Main entry point for the partial index benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///partial_index_bench.sqlite", help="Benchmark database URL")
+    parser.add_argument("--rows", type=int, default=200000, help="Number of synthetic bookings")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+    parser.add_argument("--no-plans", action="store_true", help="Skip printing query plans")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    now = datetime.utcnow()
+    print(f"Populating {args.rows} bookings into {engine.url.render_as_string(hide_password=True)}")
+    populate(engine, args.rows, now)
+    queries = benchmark_queries(now)
+
+    for index in PARTIAL_INDEXES:
+        index.drop(bind=engine, checkfirst=True)
+    before = run_phase(engine, "status index only", queries, args.repeat, not args.no_plans)
+
+    for index in PARTIAL_INDEXES:
+        index.create(bind=engine, checkfirst=True)
+    after = run_phase(engine, "with partial indexes", queries, args.repeat, not args.no_plans)
+
+    print("\n== summary (median ms) ==")
+    for name in queries:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"  {name:<36} {before[name]:8.2f} -> {after[name]:8.2f}  ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
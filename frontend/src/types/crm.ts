@@ -12,7 +12,7 @@ export type PaymentMethod = 'CASH' | 'EFT' | 'CARD' | 'PENDING';
 
 export interface ActivityEvent {
   id: string;
-  type: 'created' | 'check_in' | 'collected' | 'note_added' | 'status_changed' | 'overstay_marked';
+  type: 'created' | 'check_in' | 'collected' | 'note_added' | 'note_deleted' | 'status_changed' | 'updated' | 'overstay_marked';
   description: string;
   timestamp: Date;
   user?: string;